@@ -1,26 +1,52 @@
 """
 Module: data_tools/data_utils/data_config.py
 Description: Defines useful data tools config values for project e.g. key folder location.
-"""
-import os
 
-# Get the absolute path to the directory containing this config file
-CONFIG_DIR = os.path.dirname(os.path.abspath(__file__))
+The absolute paths are resolved once, at import, and held in the frozen (immutable and
+hashable) DataPaths dataclass instance PATHS. The module level path constants are str
+aliases of the PATHS members.
+"""
+from dataclasses import dataclass
+from pathlib import Path
 
 # Get the absolute path to the data_tools root (one level up from data_utils)
-DATA_TOOLS_ROOT = os.path.dirname(CONFIG_DIR)
-
-# Define the path to the main language data work in progress (wip) directory
-DATA_TOOLS_DATA_DIR_PATH = os.path.join(DATA_TOOLS_ROOT, "data_wip")
-
-# Define the path to the test language data directory
-DATA_TOOLS_TEST_DATA_DIR_PATH = os.path.join(DATA_TOOLS_ROOT, "data_test")
-
-# Define paths to specific data files
-# French to English files for all words
-FRENCH_ENGLISH_WORDS_CSV = os.path.join(
-    DATA_TOOLS_DATA_DIR_PATH, "fr_en_words_v1.csv")
-FRENCH_ENGLISH_WORDS_FEA = os.path.join(
-    DATA_TOOLS_DATA_DIR_PATH, "fr_en_words_v1.fea")
-FRENCH_ENGLISH_WORDS_TLCHK_FEA = os.path.join(
-    DATA_TOOLS_DATA_DIR_PATH, "fr_en_words_tlchk_v1.fea")
\ No newline at end of file
+_DATA_TOOLS_ROOT = Path(__file__).resolve().parent.parent
+
+
+@dataclass(frozen=True)
+class DataPaths:
+    """Absolute paths to the key data tools folders and files."""
+    # the directory containing this config file
+    config_dir: Path = _DATA_TOOLS_ROOT / "data_utils"
+    # the data_tools root directory
+    data_tools_root: Path = _DATA_TOOLS_ROOT
+    # the main language data work in progress (wip) directory
+    data_dir: Path = _DATA_TOOLS_ROOT / "data_wip"
+    # the test language data directory
+    test_data_dir: Path = _DATA_TOOLS_ROOT / "data_test"
+    # French to English files for all words
+    fr_en_words_csv: Path = _DATA_TOOLS_ROOT / "data_wip" / "fr_en_words_v1.csv"
+    fr_en_words_fea: Path = _DATA_TOOLS_ROOT / "data_wip" / "fr_en_words_v1.fea"
+    fr_en_words_tlchk_fea: Path = _DATA_TOOLS_ROOT / "data_wip" / "fr_en_words_tlchk_v1.fea"
+    # the persistent translation cache (used by the translation checker)
+    translation_cache_db: Path = _DATA_TOOLS_ROOT / "data_wip" / "_translate_cache.db"
+
+
+PATHS = DataPaths()
+
+# Define the path constants as str aliases of the PATHS members
+CONFIG_DIR = str(PATHS.config_dir)
+DATA_TOOLS_ROOT = str(PATHS.data_tools_root)
+DATA_TOOLS_DATA_DIR_PATH = str(PATHS.data_dir)
+DATA_TOOLS_TEST_DATA_DIR_PATH = str(PATHS.test_data_dir)
+FRENCH_ENGLISH_WORDS_CSV = str(PATHS.fr_en_words_csv)
+FRENCH_ENGLISH_WORDS_FEA = str(PATHS.fr_en_words_fea)
+FRENCH_ENGLISH_WORDS_TLCHK_FEA = str(PATHS.fr_en_words_tlchk_fea)
+TRANSLATION_CACHE_DB = str(PATHS.translation_cache_db)
+
+# Define the keyword arguments used by all the Feather file writers (pandas to_feather, pyarrow write_feather):
+# Feather V2 with zstd compression (level 3), written in chunks of 64K rows.
+# zstd is used rather than lz4: the language and report files are small, so zstd's
+# write and read cost is negligible here, and it produces noticeably smaller files
+# (the categorical language frame roughly halves in size, a clear gain over lz4)
+FEATHER_WRITE_KWARGS = dict(version=2, compression='zstd', compression_level=3, chunksize=65536)
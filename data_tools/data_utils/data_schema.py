@@ -13,8 +13,13 @@ This file specifies schemas for:
 It also includes functions for runtime schema validation of Pandas DataFrames
 against these defined schemas, ensuring data integrity throughout the process.
 """
+import functools
 from typing import TypedDict, Literal, Optional
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+from data_tools.data_utils.data_config import FEATHER_WRITE_KWARGS
 
 
 # Schema for the core language data (for learning apps, etc.)
@@ -52,7 +57,7 @@ class ValidationReportDataSchema(LanguageDataSchema):
     translation: str  # translation of source phrase or noun
     fuzzy_ratio: int  # fuzzy ratio comparing source phrase translation to target_phrase_short, range 0-100
     lexical_gender: Optional[Literal['m', 'f']]  # lexical gender of given source_noun
-    is_gender_match: bool  # True if lexical gender matches source_noun_gender
+    is_gender_match: Optional[bool]  # True if lexical gender matches source_noun_gender, None if not checked
     is_needs_review: bool  # True if source and target need review e.g. low fuzzy_ratio or gender mismatch
     review_reason: str  # summary reason for review
     review_detail: str  # detailed reason for review
@@ -62,6 +67,87 @@ class ValidationReportDataSchema(LanguageDataSchema):
 
 ValidationReportDataFrameType = pd.DataFrame  # Type alias for Validation Report DataFrame
 
+# Map Arrow string types to the pyarrow-backed pandas string dtype when loading a Feather file
+ARROW_TO_PANDAS_STRING_DTYPES = {pa.string(): pd.StringDtype("pyarrow"),
+                                 pa.large_string(): pd.StringDtype("pyarrow")}
+
+# Map gender columns to their categories, these columns are loaded as categorical columns
+CATEGORICAL_COLS = {'source_noun_gender': ['m', 'f'],
+                    'lexical_gender': ['m', 'f']}
+
+# Define the language columns, these columns may be categorical (with a single category)
+CATEGORICAL_LANGUAGE_COLS = ['source_language', 'target_language']
+
+# Define the nullable bool columns, these columns are loaded with the nullable 'boolean' dtype
+NULLABLE_BOOL_COLS = ['is_gender_match']
+
+
+@functools.lru_cache(maxsize=None)
+def _schema_spec(expected_schema: type) -> tuple:
+    """Return the column names and the expected dtype names for given schema.
+
+    The spec is derived once per schema from the schema annotations.
+    String columns may be the pandas 'object' dtype or the (pyarrow-backed)
+    'string' dtype. Gender and language columns may also be the 'category' dtype.
+    Optional bool columns may be the nullable 'boolean' dtype.
+
+    Args:
+        expected_schema (type): Expected schema as a TypedDict type.
+
+    Returns:
+        tuple: (column names frozenset, dict mapping column name to tuple of expected dtype names)
+    """
+    expected_columns = frozenset(expected_schema.__annotations__)
+
+    expected_dtype_names = {}
+    for col_name, expected_type in expected_schema.__annotations__.items():
+        if col_name in CATEGORICAL_LANGUAGE_COLS:
+            expected_dtype_names[col_name] = ('object', 'string', 'category')
+        elif expected_type is str or expected_type is Optional[str]:
+            expected_dtype_names[col_name] = ('object', 'string')
+        elif expected_type is Literal['m', 'f'] or expected_type is Optional[Literal['m', 'f']]:
+            expected_dtype_names[col_name] = ('object', 'string', 'category')
+        elif expected_type is bool:
+            expected_dtype_names[col_name] = ('bool',)
+        elif expected_type is Optional[bool]:
+            expected_dtype_names[col_name] = ('bool', 'boolean')
+        elif expected_type is int:
+            expected_dtype_names[col_name] = ('int64',)
+        elif expected_type is float:
+            expected_dtype_names[col_name] = ('float64',)
+        else:
+            expected_dtype_names[col_name] = ('object',)
+
+    return expected_columns, expected_dtype_names
+
+
+@functools.lru_cache(maxsize=None)
+def _arrow_fields(expected_schema: type) -> dict:
+    """Return dict mapping each column name of given schema to its Arrow field.
+
+    The fields are derived once per schema from the schema annotations.
+    String and gender columns are Arrow strings. All the fields are nullable.
+
+    Args:
+        expected_schema (type): Expected schema as a TypedDict type.
+
+    Returns:
+        dict: column name to pa.Field
+    """
+    arrow_fields = {}
+    for col_name, expected_type in expected_schema.__annotations__.items():
+        if expected_type is bool or expected_type is Optional[bool]:
+            arrow_type = pa.bool_()
+        elif expected_type is int:
+            arrow_type = pa.int64()
+        elif expected_type is float:
+            arrow_type = pa.float64()
+        else:
+            arrow_type = pa.string()
+        arrow_fields[col_name] = pa.field(col_name, arrow_type)
+
+    return arrow_fields
+
 
 def validate_dataframe_schema(df: pd.DataFrame, expected_schema: type):
     """Validates DataFrame schema against an expected schema.
@@ -77,34 +163,24 @@ def validate_dataframe_schema(df: pd.DataFrame, expected_schema: type):
         ValueError: If DataFrame columns do not match the expected schema.
         TypeError: If DataFrame data types do not match the expected schema.
     """
-    expected_columns = sorted(expected_schema.__annotations__.keys())
+    # get the name of each column's dtype in one pass
+    actual_dtype_names = df.dtypes.astype(str).to_dict()
+
+    expected_columns, expected_dtype_names = _schema_spec(expected_schema)
     # print(f'validate_dataframe_schema() {expected_columns=}')
-    actual_columns = sorted(df.columns.tolist())
+    actual_columns = frozenset(df.columns)
     # print(f'validate_dataframe_schema() {actual_columns=}')
 
-    if actual_columns != expected_columns:
+    if actual_columns != expected_columns or len(df.columns) != len(actual_columns):
         raise ValueError(
-            f"Data structure mismatch: Expected columns {expected_columns}, "
-            f"but got {actual_columns}."
+            f"Data structure mismatch: Expected columns {sorted(expected_columns)}, "
+            f"but got {sorted(df.columns.tolist())}."
         )
 
-    expected_dtypes = expected_schema.__annotations__
-    for col_name, expected_type in expected_dtypes.items():
-        actual_dtype_name = str(df[col_name].dtype)
-        if (expected_type is str or expected_type is Optional[str]
-                or expected_type is Literal['m', 'f']
-                or expected_type is Optional[Literal['m', 'f']]):
-            expected_dtype_name_check = 'object'
-        elif expected_type is bool or expected_type is Optional[bool]:
-            expected_dtype_name_check = 'bool'
-        elif expected_type is int:
-            expected_dtype_name_check = 'int64'
-        elif expected_type is float:
-            expected_dtype_name_check = 'float64'
-        else:
-            expected_dtype_name_check = 'object'
-
-        if actual_dtype_name != expected_dtype_name_check:
+    for col_name, expected_dtype_names_check in expected_dtype_names.items():
+        actual_dtype_name = actual_dtype_names[col_name]
+        if actual_dtype_name not in expected_dtype_names_check:
+            expected_dtype_name_check = "' or '".join(expected_dtype_names_check)
             raise TypeError(
                 f"Data type mismatch for column '{col_name}': "
                 f"Expected type compatible with '{expected_dtype_name_check}', "
@@ -144,11 +220,51 @@ def validate_report_dataframe_schema(df: pd.DataFrame):
     validate_dataframe_schema(df, ValidationReportDataSchema)
 
 
-def load_report_data_df_from_feather(feather_filepath: str) -> ValidationReportDataFrameType:
+def generate_no_diacritic(series: pd.Series) -> pd.Series:
+    """Return series of strings with diacritics removed e.g. 'être' becomes 'etre'.
+
+    This is the canonical generator for the source_phrase_no_diacritic column,
+    it is called once when the language data is ingested and the result is
+    stored in the Feather file.
+
+    The strings are decomposed (NFKD) and their combining marks removed using
+    vectorised Arrow compute functions. Any string that is still not ASCII
+    (e.g. 'cœur') is transliterated with unidecode instead.
+
+    Args:
+        series (pd.Series): Series of strings.
+
+    Returns:
+        pd.Series: Series of strings without diacritics, with the same index.
+    """
+    from unidecode import unidecode  # data tools dependency, not required by the apps
+
+    strings = pa.array(series, type=pa.string())
+    strings_folded = pc.replace_substring_regex(pc.utf8_normalize(strings, form='NFKD'),
+                                                pattern=r'\p{Mn}', replacement='')
+    is_ascii = pc.string_is_ascii(strings_folded).to_pylist()
+
+    return pd.Series([s_folded if s_is_ascii else unidecode(s)
+                      for s, s_folded, s_is_ascii in zip(series, strings_folded.to_pylist(), is_ascii)],
+                     index=series.index, dtype=object)
+
+
+def load_report_data_df_from_feather(feather_filepath: str,
+                                     columns: Optional[list] = None) -> ValidationReportDataFrameType:
     """Loads the report dataframe from a Feather file and validates its schema.
 
+    The Feather file is memory-mapped and converted to pandas without an
+    intermediate copy, decoding the columns in parallel. String columns are
+    loaded with the pyarrow-backed pandas 'string' dtype, the gender
+    columns (see CATEGORICAL_COLS) with the 'category' dtype and the nullable
+    bool columns (see NULLABLE_BOOL_COLS) with the 'boolean' dtype.
+
+    Only the given columns are read from the file, if columns is set. The
+    schema of a partial dataframe is not validated.
+
     Args:
         feather_filepath (str): Path to the Feather file.
+        columns (list of str, optional): Columns to load. Defaults to None i.e. load all columns.
 
     Returns:
         ReportDataFrameType: The loaded report data dataframe.
@@ -159,12 +275,43 @@ def load_report_data_df_from_feather(feather_filepath: str) -> ValidationReportD
         TypeError: If the loaded DataFrame does not conform to ValidationReportDataSchema.
     """
     try:
-        df = pd.read_feather(feather_filepath)
+        table = feather.read_table(feather_filepath, columns=columns, memory_map=True)
+        df = table.to_pandas(self_destruct=True, split_blocks=True, use_threads=True,
+                             types_mapper=ARROW_TO_PANDAS_STRING_DTYPES.get)
     except FileNotFoundError:
         raise FileNotFoundError(f"Feather file not found at {feather_filepath}")
     except Exception as e:
         raise RuntimeError(f"Error reading Feather file: {e}")
 
-    validate_report_dataframe_schema(df)
+    # convert the gender columns to categorical
+    for col_name, categories in CATEGORICAL_COLS.items():
+        if col_name in df.columns:
+            df[col_name] = df[col_name].astype(pd.CategoricalDtype(categories))
+
+    # convert the nullable bool columns to the nullable boolean dtype
+    for col_name in NULLABLE_BOOL_COLS:
+        if col_name in df.columns:
+            df[col_name] = df[col_name].astype('boolean')
+
+    if columns is None:
+        validate_report_dataframe_schema(df)
 
-    return df  # type: ValidationReportDataSchema
\ No newline at end of file
+    return df  # type: ValidationReportDataSchema
+
+
+def save_report_data_df_to_feather(df: ValidationReportDataFrameType, feather_filepath: str):
+    """Saves the report dataframe to a zstd compressed Feather file (see FEATHER_WRITE_KWARGS).
+
+    The dataframe is converted to an Arrow table using the Arrow types derived
+    from the ValidationReportDataSchema, rather than inferring the type of each
+    column from its values, and the table is written directly with pyarrow.
+    The column order of the dataframe is kept.
+
+    Args:
+        df (ValidationReportDataFrameType): The report dataframe, with a schema already validated.
+        feather_filepath (str): Path to the Feather file.
+    """
+    arrow_fields = _arrow_fields(ValidationReportDataSchema)
+    arrow_schema = pa.schema([arrow_fields[col_name] for col_name in df.columns])
+    table = pa.Table.from_pandas(df, schema=arrow_schema, preserve_index=False)
+    feather.write_feather(table, feather_filepath, **FEATHER_WRITE_KWARGS)
@@ -3,16 +3,232 @@ Module: data_tools/data_utils/translation.py
 Translation classes.
 
 """
+import atexit
+import functools
 import logging
+import requests
+import shelve
+import threading
+import time
+import data_tools.data_utils.data_config as data_config
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
-from deep_translator import GoogleTranslator  # type: ignore
-from fuzzywuzzy import fuzz  # type: ignore
-from pylexique import Lexique383  # French language lexicon
+
+# note: the translator (deep_translator), fuzzy string matcher (rapidfuzz) and French
+# language lexicon (pylexique) packages are imported on first use, importing pylexique
+# loads the lexicon
 
 # setup logger
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.WARNING)
 
+# define translator API limits
+TRANSLATOR_MAX_REQUESTS_PER_SECOND = None  # optional rate limit for translator API requests, None for no limit
+TRANSLATOR_MAX_WORKERS = 32  # number of threads used to make parallel translator API requests
+
+# define thread local translators and the locks to share the translation cache and
+# the translator rate limit between threads
+_translator_thread_local = threading.local()
+_translation_cache_lock = threading.Lock()
+_translator_rate_limit_lock = threading.Lock()
+_next_translator_request_time = 0.0
+
+# define the on-disk translation cache (shelve) handle, opened once on first use and closed at exit
+_translation_cache = None
+
+# define sentinel for a word that is not in the lexical database
+_MISSING = object()
+
+# define immutable gender check result, safe to share from the gender check cache
+GenderCheckResult = namedtuple('GenderCheckResult', ['is_gender_match', 'lexical_gender', 'gender_error'])
+
+# define immutable translation check result, unpacked by the batch translation check callers
+TranslationCheckResult = namedtuple('TranslationCheckResult', ['translation', 'fuzzy_ratio', 'translation_error'])
+
+# ------------------------------------------------------------------------------
+# functions
+# ------------------------------------------------------------------------------
+
+
+@functools.cache
+def _get_rate_limited_translator_class():
+    """Return the translator class, a GoogleTranslator that is rate limited per translator API request.
+
+    Each translate() request waits for a rate limit slot. The deep_translator batch
+    call, translate_batch(), loops over the texts making one translate() request per
+    text, so a batch call is also rate limited per underlying request.
+    """
+    from deep_translator import GoogleTranslator  # type: ignore
+
+    class RateLimitedGoogleTranslator(GoogleTranslator):
+        def translate(self, text, **kwargs):
+            _wait_for_translator_request_slot()
+            return super().translate(text, **kwargs)
+
+    return RateLimitedGoogleTranslator
+
+
+def _get_translator(source_language: str, target_language: str, is_new: bool = False):
+    """Return this thread's translator instance for given source and target language.
+
+    The translator instance is created on first use, or if is_new is True.
+    Each thread has its own instances as a translator holds per-request state.
+    """
+    translator_class = _get_rate_limited_translator_class()
+
+    translators = _translator_thread_local.__dict__.setdefault('translators', {})
+    if is_new or (source_language, target_language) not in translators:
+        logger.debug(f"create translator: {source_language=}, {target_language=}")
+        translators[(source_language, target_language)] = translator_class(source=source_language,
+                                                                           target=target_language)
+    return translators[(source_language, target_language)]
+
+
+def _wait_for_translator_request_slot():
+    """Wait until the next translator API request is allowed by the rate limit.
+
+    Spaces the translator API requests, from all threads, at least
+    1 / TRANSLATOR_MAX_REQUESTS_PER_SECOND seconds apart.
+    Returns immediately if TRANSLATOR_MAX_REQUESTS_PER_SECOND is None.
+    """
+    global _next_translator_request_time
+    if TRANSLATOR_MAX_REQUESTS_PER_SECOND is None:
+        return
+
+    with _translator_rate_limit_lock:
+        now = time.monotonic()
+        wait_secs = _next_translator_request_time - now
+        _next_translator_request_time = (max(now, _next_translator_request_time)
+                                         + 1 / TRANSLATOR_MAX_REQUESTS_PER_SECOND)
+
+    if wait_secs > 0:
+        time.sleep(wait_secs)
+
+
+def _request_translation(source_language: str, target_language: str, text: str) -> str:
+    """Return translation of text from source to target language using the translator API.
+
+    The request is rate limited, if a limit is set, and uses the calling thread's translator.
+    """
+    try:
+        return _get_translator(source_language, target_language).translate(text)
+    except requests.exceptions.ConnectionError:
+        # the translator may be stale, recreate it and retry once
+        logger.info("translator connection error, recreate translator and retry")
+        return _get_translator(source_language, target_language, is_new=True).translate(text)
+
+
+def _request_batch_translation(source_language: str, target_language: str, texts: list) -> list:
+    """Return list of translations of texts from source to target language using the translator API.
+
+    The texts are translated with a single translator batch call (translate_batch), which makes
+    one request per text, each rate limited if a limit is set, using the calling thread's translator.
+    """
+    try:
+        return _get_translator(source_language, target_language).translate_batch(texts)
+    except requests.exceptions.ConnectionError:
+        # the translator may be stale, recreate it and retry the batch once
+        logger.info("translator connection error, recreate translator and retry batch")
+        return _get_translator(source_language, target_language, is_new=True).translate_batch(texts)
+
+
+def _get_translation_cache():
+    """Return the on-disk translation cache, a shelve of translations keyed by language pair and text.
+
+    The shelve is opened once, on first use, and closed when the process exits.
+    The caller must hold _translation_cache_lock.
+    """
+    global _translation_cache
+    if _translation_cache is None:
+        logger.debug(f"open translation cache: {data_config.TRANSLATION_CACHE_DB=}")
+        _translation_cache = shelve.open(data_config.TRANSLATION_CACHE_DB)
+        atexit.register(_close_translation_cache)
+    return _translation_cache
+
+
+def _close_translation_cache():
+    """Close the on-disk translation cache, if open, writing any pending translations to disk."""
+    global _translation_cache
+    with _translation_cache_lock:
+        if _translation_cache is not None:
+            _translation_cache.close()
+            _translation_cache = None
+
+
+@functools.lru_cache(maxsize=100_000)
+def _translate(source_language: str, target_language: str, text: str) -> str:
+    """Return translation of text from source to target language.
+
+    Translations are memoized in memory and persisted on disk (in the
+    TRANSLATION_CACHE_DB shelve) so that repeated phrases, within a run
+    or across runs, do not make another translator API call.
+
+    Safe to call from multiple threads, the shelve access is serialised and
+    the translator API requests are rate limited, if a limit is set.
+
+    Use _translate.cache_clear() to invalidate the in-memory cache, the on-disk
+    cache is invalidated by deleting the TRANSLATION_CACHE_DB files.
+    """
+    cache_key = f"{source_language}|{target_language}|{text}"
+    with _translation_cache_lock:
+        translation_cache = _get_translation_cache()
+        if cache_key in translation_cache:
+            logger.debug(f"translation cache hit: {cache_key=}")
+            return translation_cache[cache_key]
+
+    translation = _request_translation(source_language, target_language, text)
+
+    with _translation_cache_lock:
+        _get_translation_cache()[cache_key] = translation
+
+    return translation
+
+
+def _translate_batch(source_language: str, target_language: str, texts: list) -> list:
+    """Return list of translations of texts from source to target language.
+
+    Texts already in the on-disk translation cache are not translated again,
+    the remaining unique texts are split into one slice per thread and each
+    slice is translated with a translator batch call, in a thread pool, and
+    then added to the cache. The translator API requests are I/O bound so
+    the threads overlap while waiting on the network, the requests are rate
+    limited if a limit is set. The new translations are synced to disk once the batch is added.
+
+    Note: the translator batch call makes one API request per text, so a batch
+    only groups the cache lookups, the cache updates and the disk sync, it does
+    not reduce the number of translator API requests.
+    """
+    cache_keys = [f"{source_language}|{target_language}|{text}" for text in texts]
+    with _translation_cache_lock:
+        translation_cache = _get_translation_cache()
+        texts_to_translate = list(dict.fromkeys(
+            text for text, cache_key in zip(texts, cache_keys) if cache_key not in translation_cache))
+    logger.debug(f"translate batch of {len(texts)} texts, {len(texts_to_translate)} not in cache")
+
+    if texts_to_translate:
+        # the batch call translates its texts one after another, so the texts are sliced across the threads
+        slice_size = -(-len(texts_to_translate) // TRANSLATOR_MAX_WORKERS)  # ceiling division
+        text_slices = [texts_to_translate[slice_start:slice_start + slice_size]
+                       for slice_start in range(0, len(texts_to_translate), slice_size)]
+        with ThreadPoolExecutor(max_workers=len(text_slices)) as executor:
+            translations = [translation
+                            for slice_translations in executor.map(
+                                functools.partial(_request_batch_translation, source_language, target_language),
+                                text_slices)
+                            for translation in slice_translations]
+        with _translation_cache_lock:
+            translation_cache = _get_translation_cache()
+            for text, translation in zip(texts_to_translate, translations):
+                translation_cache[f"{source_language}|{target_language}|{text}"] = translation
+            translation_cache.sync()
+
+    with _translation_cache_lock:
+        translation_cache = _get_translation_cache()
+        return [translation_cache[cache_key] for cache_key in cache_keys]
+
+
 # ------------------------------------------------------------------------------
 # classes
 # ------------------------------------------------------------------------------
@@ -49,7 +265,8 @@ class GenericTranslationChecker:
         """Initialises GenericTranslationChecker.
 
         Sets source and target languages.
-        Sets translator and fuzzy string matchiner functions.
+        Sets fuzzy string matcher function; translation uses the memoized
+        module translator function.
 
         Args:
             source_language (str): Source language code (e.g., 'French').
@@ -57,8 +274,11 @@ class GenericTranslationChecker:
         """
         self.source_language = source_language.lower()
         self.target_language = target_language.lower()
-        self.translator = GoogleTranslator  # selected translator function
+
+        from rapidfuzz import fuzz, utils as fuzz_utils
         self.fuzzer = fuzz.token_set_ratio  # selected fuzzy string matcher function
+        self.fuzzer_processor = fuzz_utils.default_process  # lowercase and strip non-alphanumerics (as fuzzywuzzy)
+        self.check_gender_fast = self.check_gender  # no specialised gender check for generic checker
         logger.debug(f"{self.source_language=}, {self.target_language=}")
 
     def check_translation(self, source_text: str,
@@ -78,13 +298,12 @@ class GenericTranslationChecker:
                 'is_exact_match' (bool): True if provided translation is an exact match.
                 'is_substring_match' (bool): True if provided is a substring of API or vice-versa.
                 'is_word_in_api_translation' (bool): True if any word from provided is in API translation.
-                'fuzzy_ratio' (float): Fuzzy string matching ratio (0-100).
+                'fuzzy_ratio' (int): Fuzzy string matching ratio (0-100).
                 'error' (Optional[str]): Error message if API call fails, else None.
         """
         logger.debug(f"check_translation({source_text=}, {provided_target_translation=}")
         try:
-            translation_result = self.translator(source=self.source_language,
-                                                 target=self.target_language).translate(source_text)
+            translation_result = _translate(self.source_language, self.target_language, source_text)
             logger.info(f"{translation_result=}")
             # api_translation = translation_result.lower().strip()
             # provided_translation_lower = provided_target_translation.lower().strip()
@@ -97,15 +316,8 @@ class GenericTranslationChecker:
             # if provided_words.intersection(api_words):
             #     is_word_in_api_translation = True
 
-            # check match using fuzzy string matcher
-            fuzzy_ratio = self.fuzzer(translation_result, provided_target_translation)
-
-            # return result
-            return {
-                'translation': translation_result,
-                'fuzzy_ratio': fuzzy_ratio,
-                'translation_error': None
-            }
+            # check match using fuzzy string matcher and return result
+            return self.get_translation_check_result(translation_result, provided_target_translation)
         except Exception as e:
             return {
                 'translation': None,
@@ -113,6 +325,82 @@ class GenericTranslationChecker:
                 'translation_error': str(e)
             }
 
+    def check_translations(self, source_texts: list,
+                           provided_target_translations: list) -> list:
+        """Checks a batch of translations using translator.
+
+        Translates the source texts with a single batch call and compares
+        each provided target translation against its API translation.
+        If the batch call fails, each translation is made individually
+        so that the error is reported against the failing source text.
+        The translations are scored with a single call to the fuzzy string
+        matcher, see get_fuzzy_ratios().
+
+        Args:
+            source_texts (list of str): Phrases in the source language.
+            provided_target_translations (list of str): Provided target translations,
+                                                        one for each source text.
+
+        Returns:
+            list of TranslationCheckResult: translation check results, in the same
+                                            order as source_texts, with the same fields
+                                            as the check_translation() dict.
+        """
+        logger.debug(f"check_translations({len(source_texts)=}, {len(provided_target_translations)=}")
+        try:
+            translation_results = _translate_batch(self.source_language, self.target_language, source_texts)
+            translation_errors = [None] * len(source_texts)
+        except Exception as e:
+            logger.info(f"batch translation failed, translate individually: {e}")
+            translation_results = []
+            translation_errors = []
+            for source_text in source_texts:
+                try:
+                    translation_results.append(_translate(self.source_language, self.target_language, source_text))
+                    translation_errors.append(None)
+                except Exception as e:
+                    translation_results.append(None)
+                    translation_errors.append(str(e))
+
+        # score the translated pairs with one call to the fuzzy string matcher
+        is_translated = [translation_error is None for translation_error in translation_errors]
+        fuzzy_ratios = iter(self.get_fuzzy_ratios(
+            [translation_result for translation_result, ok in zip(translation_results, is_translated) if ok],
+            [provided for provided, ok in zip(provided_target_translations, is_translated) if ok]))
+
+        return [TranslationCheckResult(translation=translation_result,
+                                       fuzzy_ratio=next(fuzzy_ratios) if ok else None,
+                                       translation_error=translation_error)
+                for translation_result, translation_error, ok
+                in zip(translation_results, translation_errors, is_translated)]
+
+    def get_fuzzy_ratios(self, translation_results: list,
+                         provided_target_translations: list) -> list:
+        """Return list of int fuzzy ratios for given API translations and provided translations.
+
+        All the pairs are scored with a single (multithreaded) call to the
+        rapidfuzz cpdist function, rather than one fuzzy matcher call per pair.
+        """
+        if not translation_results:
+            return []
+
+        from rapidfuzz import process
+        fuzzy_ratios = process.cpdist(translation_results, provided_target_translations,
+                                      scorer=self.fuzzer, processor=self.fuzzer_processor, workers=-1)
+        return [round(float(fuzzy_ratio)) for fuzzy_ratio in fuzzy_ratios]
+
+    def get_translation_check_result(self, translation_result: str,
+                                     provided_target_translation: str) -> dict:
+        """Return translation check result for given API translation and provided translation."""
+        fuzzy_ratio = self.fuzzer(translation_result, provided_target_translation,
+                                  processor=self.fuzzer_processor)
+
+        return {
+            'translation': translation_result,
+            'fuzzy_ratio': round(fuzzy_ratio),  # int ratio, as reported by fuzzywuzzy
+            'translation_error': None
+        }
+
     def validate_gender(self, source_noun: str, provided_gender: Optional[str]) -> dict:
         """Validates gender of a source noun.
 
@@ -129,9 +417,13 @@ class GenericTranslationChecker:
                 'lexical_gender' (Optional[Literal['m', 'f']]): Always None in Generic Checker.
                 'gender_error' (Optional[str]): Error message indicating lack of implementation.
         """
-        return {'is_gender_match': None,
-                'lexical_gender': None,
-                'gender_error': "Gender validation not implemented for this language pair."}
+        return self.check_gender(source_noun, provided_gender)._asdict()
+
+    def check_gender(self, source_noun: str, provided_gender: Optional[str]) -> GenderCheckResult:
+        """Return GenderCheckResult for given source noun and provided gender, see validate_gender()."""
+        return GenderCheckResult(is_gender_match=None,
+                                 lexical_gender=None,
+                                 gender_error="Gender validation not implemented for this language pair.")
 
 
 # --- FRENCH-ENGLISH CHECKER ---
@@ -140,14 +432,75 @@ class FrenchEnglishChecker(GenericTranslationChecker):
 
     Used to validate gender of given French noun."""
 
+    # The selected pylexique lexical analyser object and the derived word to gender
+    # map are created on first use and shared by all FrenchEnglishChecker instances
+    _shared_lex383 = None
+    _shared_word_to_gender = None
+
     def __init__(self):
         """Initializes FrenchEnglishChecker."""
         super().__init__("French", "English")
-
-        # Instantiate selected pylexique lexical analyser object
-        self.lex383 = Lexique383()
         self.verbose = False
 
+        # map each word in the lexical database to its gender (or None)
+        if FrenchEnglishChecker._shared_word_to_gender is None:
+            FrenchEnglishChecker._shared_word_to_gender = self.build_word_to_gender()
+        self._word_to_gender = FrenchEnglishChecker._shared_word_to_gender
+
+        # memoize gender checks for this checker's word to gender map, nouns often recur
+        self._check_gender_cached = functools.lru_cache(maxsize=50_000)(self.check_gender)
+
+        # specialise gender check for the common case, noun found with a gender
+        self.check_gender_fast = self.make_check_gender_fast()
+
+    def make_check_gender_fast(self):
+        """Return gender check function specialised for this checker's word to gender map.
+
+        The returned function has the same arguments and result as check_gender().
+        It handles a noun found in the word to gender map with a gender inline and
+        falls back to the cached check_gender() for the other cases.
+        """
+        word_to_gender_get = self._word_to_gender.get
+        check_gender_cached = self._check_gender_cached
+
+        def check_gender_fast(french_noun: str, provided_gender: Optional[str]) -> GenderCheckResult:
+            lexique_gender = word_to_gender_get(french_noun)
+            if lexique_gender is None:
+                # noun not found or gender not determined
+                return check_gender_cached(french_noun, provided_gender)
+            if lexique_gender == provided_gender:
+                return GenderCheckResult(is_gender_match=True, lexical_gender=lexique_gender, gender_error=None)
+            return GenderCheckResult(is_gender_match=False,
+                                     lexical_gender=lexique_gender,
+                                     gender_error=(
+                                         f"gender mismatch: lexical gender '{lexique_gender}' "
+                                         f"does not match provided gender '{provided_gender}'"))
+
+        return check_gender_fast
+
+    @classmethod
+    def _get_lex(cls):
+        """Return the shared pylexique lexical analyser object, instantiating it on first use."""
+        if cls._shared_lex383 is None:
+            from pylexique import Lexique383  # French language lexicon
+            cls._shared_lex383 = Lexique383()
+        return cls._shared_lex383
+
+    @property
+    def lex383(self):
+        """Return the shared pylexique lexical analyser object."""
+        return self._get_lex()
+
+    def build_word_to_gender(self):
+        """Return dict mapping each word in pylexique (Lexique383) dictionary to its gender.
+
+        The gender is 'm', 'f' or None if the gender cannot be determined.
+        """
+        logger.debug("build word to gender map from lex383 dictionary")
+        return {word: self.get_pylexique_gender_from_cgram_genre_pair_list(
+                    self.get_pylexique_cgram_genre_pairs(word))
+                for word in self.lex383.lexique}
+
     def get_pylexique_cgram_genre_pairs(self, word, verbose=False):
         """Return pylexique list of (cgram, genre) pairs for given word.
 
@@ -175,19 +528,14 @@ class FrenchEnglishChecker(GenericTranslationChecker):
                 print(f"{word=} not in lex383 dictionary")
             return None
 
-        cg_gn_pairs = []
+        # normalise the lex383 result, which is a single item or a list of items
         lex383_res = self.lex383.lexique[word]
-        if not isinstance(lex383_res, list):
-            # single item
-            lex_item = lex383_res
-            if verbose:
-                print(f"single item: {lex_item=}, {lex_item.cgram=}, {lex_item.genre=}")
-            cg_gn_pairs.append((lex_item.cgram, lex_item.genre))
-        else:
-            for lex_item in lex383_res:
-                if verbose:
-                    print(f"multiple item: {lex_item=}, {lex_item.cgram=}, {lex_item.genre=}")
-                cg_gn_pairs.append((lex_item.cgram, lex_item.genre))
+        lex_items = lex383_res if isinstance(lex383_res, list) else (lex383_res,)
+        if verbose:
+            for lex_item in lex_items:
+                print(f"item: {lex_item=}, {lex_item.cgram=}, {lex_item.genre=}")
+
+        cg_gn_pairs = [(lex_item.cgram, lex_item.genre) for lex_item in lex_items]
 
         if verbose:
             print(f"return cgram genre pair list: {cg_gn_pairs}")
@@ -261,35 +609,37 @@ class FrenchEnglishChecker(GenericTranslationChecker):
                 'lexical_gender' (Optional[Literal['m', 'f']]): Gender from Lexique3 if found, else None.
                 'gender_error' (Optional[str]): Error message if validation fails, else None.
         """
-        # get list of (cgram, genre) pairs for given french_noun
-        cgram_genre_pair_list = self.get_pylexique_cgram_genre_pairs(french_noun, self.verbose)
-        if not cgram_genre_pair_list:
-            return {
-                'is_gender_match': None,
-                'lexical_gender': None,
-                'gender_error': f"noun '{french_noun}' not in lexical database, check for diacritics"
-            }
+        return self._check_gender_cached(french_noun, provided_gender)._asdict()
+
+    def check_gender(self, french_noun: str, provided_gender: Optional[str]) -> GenderCheckResult:
+        """Return GenderCheckResult for given French noun and provided gender, see validate_gender()."""
+        # get gender for given french_noun from the word to gender map
+        lexique_gender = self._word_to_gender.get(french_noun, _MISSING)
+        if lexique_gender is _MISSING:
+            return GenderCheckResult(
+                is_gender_match=None,
+                lexical_gender=None,
+                gender_error=f"noun '{french_noun}' not in lexical database, check for diacritics"
+            )
 
-        # get gender from the (cgram, genre) pair list
-        lexique_gender = self.get_pylexique_gender_from_cgram_genre_pair_list(cgram_genre_pair_list, self.verbose)
         if not lexique_gender:
-            return {
-                'is_gender_match': None,
-                'lexical_gender': lexique_gender,
-                'gender_error': f"'gender could not be determined)"
-            }
+            return GenderCheckResult(
+                is_gender_match=None,
+                lexical_gender=lexique_gender,
+                gender_error="gender could not be determined"
+            )
 
         if lexique_gender == provided_gender:
-            return {
-                'is_gender_match': True,
-                'lexical_gender': lexique_gender,
-                'gender_error': None
-            }
+            return GenderCheckResult(
+                is_gender_match=True,
+                lexical_gender=lexique_gender,
+                gender_error=None
+            )
         else:
-            return {
-                'is_gender_match': False,
-                'lexical_gender': lexique_gender,
-                'gender_error': (
-                    f"gender mismatch: laxical gender '{lexique_gender}' "
+            return GenderCheckResult(
+                is_gender_match=False,
+                lexical_gender=lexique_gender,
+                gender_error=(
+                    f"gender mismatch: lexical gender '{lexique_gender}' "
                     f"does not match provided gender '{provided_gender}'")
-            }
+            )
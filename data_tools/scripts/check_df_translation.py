@@ -21,14 +21,14 @@ data and, once the issues have been resolved, for 'publication' and use in
 the language learning applications.
 """
 import logging
+import numpy as np
 import pandas as pd
 import data_tools.data_utils.data_config as data_config
 
 from tqdm import tqdm
-from typing import List
-from data_tools.data_utils.data_schema import (ValidationReportDataSchema,
-                                               validate_report_dataframe_schema,
-                                               load_report_data_df_from_feather)
+from data_tools.data_utils.data_schema import (validate_report_dataframe_schema,
+                                               load_report_data_df_from_feather,
+                                               save_report_data_df_to_feather)
 from data_tools.data_utils.translation import TranslationCheckerFactory
 from data_tools.scripts.convert_lang_csv_to_df import \
     load_language_data_df_from_feather
@@ -40,6 +40,13 @@ logger.setLevel(logging.WARNING)
 
 # define key constants
 FUZZY_RATIO_THRESHOLD = 85
+# number of phrases checked in each translation batch, a batch groups the translation cache lookups
+# and the disk sync, and its uncached phrases are shared across the translator threads
+# (each phrase is still one translator API request, a batch does not reduce the number of requests)
+TRANSLATION_BATCH_SIZE = 64
+# the columns that identify a phrase to check, duplicate phrases are checked once
+PHRASE_KEY_COLUMNS = ['source_phrase', 'target_phrase_short',
+                      'is_source_noun', 'source_noun', 'source_noun_gender']
 
 # ------------------------------------------------------------------------------
 # functions
@@ -48,62 +55,76 @@ FUZZY_RATIO_THRESHOLD = 85
 
 def analyse_errors(translation_error, fuzzy_ratio,
                    is_source_noun, gender_error, is_gender_match, lexical_gender):
-    """Analyse errors and return a summary review dictionary.
+    """Analyse errors of all the phrases and return a summary review dictionary.
+
+    The errors are analysed for all the phrases at once, using boolean masks
+    over the columns, rather than one phrase at a time. Each argument is an
+    array-like with one item per phrase.
 
     Review reasons:
+    'TM': Translation mismatch, fuzzy ratio below threshold
     'TE': Unexpected translation error
     'NNF': Noun not found
     'GNF': Gender not found
     'GM': Gender mismatch
 
     Return:
-    return_dict = {'is_needs_review': boolean, 'review_reason': str, 'review_detail': str}
-        'is_needs_review': True if review is needed
-        'review_reason': String containing the summary review reasons, separated by a ';'
-        'review_detail': String containing the detailed review reasons, separated by a ';'
+    return_dict = {'is_needs_review': array, 'review_reason': array, 'review_detail': array}
+        'is_needs_review': bool array, True if review is needed
+        'review_reason': str array, the summary review reasons, separated by a ';'
+        'review_detail': str array, the detailed review reasons, separated by a ';'
     """
-    is_needs_review = False
-    review_reason = []
-    review_detail = []
-
-    if not translation_error and fuzzy_ratio < FUZZY_RATIO_THRESHOLD:
-        is_needs_review = True
-        reason = 'TM'  # translation mismatch, fuzzy ratio below threshold
-        review_reason.append(reason)
-        review_detail.append(f"{reason}: Translation Mismatch (fuzzy ratio "
-                             f"< threshold) - {fuzzy_ratio}")
-
-    if translation_error:
-        is_needs_review = True
-        reason = 'TE'  # unexpected translation error
-        review_reason.append(reason)
-        review_detail.append(f"{reason}: {translation_error}")
-
-    if (is_source_noun and gender_error
-            and is_gender_match is None and lexical_gender is None):
-        is_needs_review = True
-        reason = 'NNF'  # Noun not found
-        review_reason.append(reason)
-        review_detail.append(f"{reason}: {gender_error}")
-
-    if (is_source_noun and gender_error
-            and is_gender_match is None and lexical_gender):
-        is_needs_review = True
-        reason = 'GNF'  # Gender not found
-        review_reason.append(reason)
-        review_detail.append(f"{reason}: {gender_error}")
-
-    if (is_source_noun and gender_error
-            and is_gender_match is False):
-        is_needs_review = True
-        reason = 'GM'  # Gender mismatch
-        review_reason.append(reason)
-        review_detail.append(f"{reason}: {gender_error}")
+    translation_error = pd.Series(translation_error, dtype=object).reset_index(drop=True)
+    fuzzy_ratio = pd.Series(fuzzy_ratio).astype('Int64').reset_index(drop=True)
+    is_source_noun = pd.Series(is_source_noun, dtype=bool).reset_index(drop=True)
+    gender_error = pd.Series(gender_error, dtype=object).reset_index(drop=True)
+    is_gender_match = pd.Series(is_gender_match, dtype='boolean').reset_index(drop=True)
+    lexical_gender = pd.Series(lexical_gender, dtype=object).reset_index(drop=True)
+
+    # boolean masks for the conditions, None and '' are falsy (as in an if statement)
+    # the sub-conditions shared by the gender checks are combined once
+    is_translation_error = (translation_error.notna() & (translation_error != '')).to_numpy(dtype=bool)
+    is_noun_gender_error = (is_source_noun & gender_error.notna() & (gender_error != '')).to_numpy(dtype=bool)
+    is_gender_not_matched = is_noun_gender_error & is_gender_match.isna().to_numpy(dtype=bool)
+    is_lexical_gender_none = lexical_gender.isna().to_numpy(dtype=bool)
+    is_lexical_gender = ~is_lexical_gender_none & (lexical_gender != '').to_numpy(dtype=bool)
+    is_fuzzy_ratio_low = (fuzzy_ratio < FUZZY_RATIO_THRESHOLD).fillna(False).to_numpy(dtype=bool)
+    is_gender_mismatch = (is_gender_match == False).fillna(False).to_numpy(dtype=bool)  # noqa: E712, element-wise
+
+    # (reason, mask, detail prefix, detail values) for each review reason, in reporting order
+    review_checks = (
+        ('TM', ~is_translation_error & is_fuzzy_ratio_low,
+         "TM: Translation Mismatch (fuzzy ratio < threshold) - ", fuzzy_ratio),
+        ('TE', is_translation_error, 'TE: ', translation_error),
+        ('NNF', is_gender_not_matched & is_lexical_gender_none, 'NNF: ', gender_error),
+        ('GNF', is_gender_not_matched & is_lexical_gender, 'GNF: ', gender_error),
+        ('GM', is_noun_gender_error & is_gender_mismatch, 'GM: ', gender_error),
+    )
+
+    # code the checks that apply to each phrase as bits (one bit per review reason) and
+    # join the details of the checks that apply, separated by a ';'
+    # the details are only formatted for the phrases that need review for that reason
+    review_codes = np.zeros(len(translation_error), dtype=np.uint8)
+    review_detail = np.full(len(translation_error), '', dtype=object)
+    for reason_bit, (reason, mask, detail_prefix, detail_values) in enumerate(review_checks):
+        if not mask.any():
+            continue
+        separator = np.where(review_codes[mask] != 0, '; ', '').astype(object)
+        details = [f"{detail_prefix}{detail_value}" for detail_value in detail_values.to_numpy(dtype=object)[mask]]
+        review_detail[mask] = review_detail[mask] + separator + np.array(details, dtype=object)
+        review_codes |= mask.astype(np.uint8) << reason_bit
+
+    # decode the review codes to the review reasons with a lookup table of all the reason combinations
+    review_reasons_by_code = np.array(
+        ['; '.join(reason for reason_bit, (reason, *_) in enumerate(review_checks) if review_code >> reason_bit & 1)
+         for review_code in range(1 << len(review_checks))], dtype=object)
+    review_reason = review_reasons_by_code[review_codes]
+    is_needs_review = review_codes != 0
 
     return {
         'is_needs_review': is_needs_review,
-        'review_reason': '; '.join(review_reason),  # convert list to ; separated string
-        'review_detail': '; '.join(review_detail)  # convert list to ; separated string
+        'review_reason': review_reason,
+        'review_detail': review_detail
     }
 
 
@@ -116,13 +137,13 @@ def main(language_feather_filepath='language_words.fea',
         1. Loads language data from the specified Feather file using reusable function.
         2. Determines the source and target languages from the loaded data.
         3. Initializes a TranslationChecker based on the language pair.
-        4. Iterates through each phrase in the language data DataFrame:
-           - Performs translation check using the generic TranslationChecker.
+        4. Performs translation check, in batches, using the generic TranslationChecker.
+        5. Iterates through each unique phrase in the language data DataFrame:
            - Performs gender validation for nouns using the specialised language TranslationChecker.
            - Aggregates validation results and flags phrases needing review.
-        5. Creates a ValidationReportDataFrame from the results.
-        6. Sorts the report DataFrame to prioritise phrases needing review.
-        7. Saves the report ValidationReportDataFrameType to a feather file.
+        6. Creates a ValidationReportDataFrame from the language columns and the results columns.
+        7. Sorts the report DataFrame to prioritise phrases needing review.
+        8. Saves the report ValidationReportDataFrameType to a feather file.
 
     Args:
         language_feather_filepath (str, optional): Path to the LanguageData Feather file.
@@ -155,119 +176,127 @@ def main(language_feather_filepath='language_words.fea',
     checker_factory = TranslationCheckerFactory()
     translation_checker = checker_factory.get_checker(source_language, target_language)
 
-    # create results list and results dictionary
-    validation_results: List[ValidationReportDataSchema] = []
-
-    # iterate through each row of the dataframe, checking the translation and gender
+    # check each unique phrase once, the check results are broadcast to any duplicate phrases
+    checked_df = language_df.head(word_limit) if word_limit else language_df
+    unique_df = checked_df.drop_duplicates(subset=PHRASE_KEY_COLUMNS)
+    phrase_groups = checked_df.groupby(PHRASE_KEY_COLUMNS, sort=False, dropna=False,
+                                       observed=True).ngroup().to_numpy()
+    logger.info(f"{len(checked_df)=}, {len(unique_df)=}")
+
+    # check the translations in batches, the source noun is translated if the phrase is a noun
+    # each unique (source text, target text) pair is checked once and its result shared by the duplicates
+    source_texts = unique_df.source_noun.where(unique_df.is_source_noun, unique_df.source_phrase).tolist()
+    target_texts = unique_df.target_phrase_short.tolist()
+    translation_pairs = list(zip(source_texts, target_texts))
+    unique_translation_pairs = list(dict.fromkeys(translation_pairs))
+    logger.info(f"{len(translation_pairs)=}, {len(unique_translation_pairs)=}")
+    unique_translation_results = {}
+    for batch_start in tqdm(range(0, len(unique_translation_pairs), TRANSLATION_BATCH_SIZE),
+                            desc="Translating source phrases..."):
+        batch_pairs = unique_translation_pairs[batch_start:batch_start + TRANSLATION_BATCH_SIZE]
+        batch_source_texts, batch_target_texts = zip(*batch_pairs)
+        unique_translation_results.update(zip(batch_pairs,
+                                              translation_checker.check_translations(list(batch_source_texts),
+                                                                                     list(batch_target_texts))))
+    translation_results = [unique_translation_results[translation_pair] for translation_pair in translation_pairs]
+
+    # create the preallocated results arrays, one item per unique phrase, these are the new report columns
+    # the object arrays are initialised to None, the fuzzy ratio is 0 if the translation failed
+    phrase_tot = len(unique_df)
+    translations = np.empty(phrase_tot, dtype=object)
+    fuzzy_ratios = np.zeros(phrase_tot, dtype=np.int64)
+    translation_errors = np.empty(phrase_tot, dtype=object)
+    is_gender_matches = np.empty(phrase_tot, dtype=object)
+    lexical_genders = np.empty(phrase_tot, dtype=object)
+    gender_errors = np.empty(phrase_tot, dtype=object)
+
+    # iterate through each unique row of the dataframe, checking the translation and gender
+    # the rows are read by zipping the column arrays, avoiding a per row object
     noun_cnt = 0
-
-    tqdm_tot = word_limit if word_limit else len(language_df)
+    row_columns = ['source_phrase', 'target_phrase',
+                   'is_source_noun', 'source_noun', 'source_noun_gender']
+    row_values = zip(*(unique_df[col_name].to_numpy() for col_name in row_columns))
+    is_info_logged = logger.isEnabledFor(logging.INFO)
+    check_gender_fast = translation_checker.check_gender_fast  # bind the method once, outside the loop
     idx = None
-    for idx, (index, row) in enumerate(tqdm(language_df.iterrows(),
-                                            desc="Processing source phrases...",
-                                            total=tqdm_tot,
-                                            initial=1),
-                                       start=1):
-        logger.info(f"Processing phrase#: {idx}")
-        source_phrase = row['source_phrase']
-        target_phrase = row['target_phrase']
-        target_phrase_short = row['target_phrase_short']
-        is_source_noun = row['is_source_noun']
-        source_noun = row['source_noun']
-        source_noun_gender = row['source_noun_gender']
-        is_ignore_translation_error = row['is_ignore_translation_error']
-        source_phrase_no_diacritic = row['source_phrase_no_diacritic']
+    for idx, (source_phrase, target_phrase,
+              is_source_noun, source_noun, source_noun_gender) in enumerate(
+            tqdm(row_values, desc="Processing source phrases...", total=phrase_tot),
+            start=1):
         gender_res = None
+        translation_res = translation_results[idx - 1]
 
         if is_source_noun:
             noun_cnt += 1
-            logger.info(f"Processing noun#: {noun_cnt}")
-
-            translation_res = translation_checker.check_translation(source_noun, target_phrase_short)
-            logger.info(f"***Translation Check: {source_noun=}, {target_phrase=}, {translation_res=}")
-
-            gender_res = translation_checker.validate_gender(source_noun, source_noun_gender)
-            logger.info(f"***Gender Check: {source_noun=}, {source_noun_gender=}, {gender_res=}")
-        else:
-            translation_res = translation_checker.check_translation(source_phrase, target_phrase_short)
-            logger.info(f"***Translation Check: {source_phrase=}, {target_phrase=}, {translation_res=}")
+            gender_res = check_gender_fast(source_noun, source_noun_gender)
+
+        # log the checks, the log messages are only formatted if info logging is enabled
+        if is_info_logged:
+            logger.info(f"Processing phrase#: {idx}")
+            if is_source_noun:
+                logger.info(f"Processing noun#: {noun_cnt}")
+                logger.info(f"***Translation Check: {source_noun=}, {target_phrase=}, {translation_res=}")
+                logger.info(f"***Gender Check: {source_noun=}, {source_noun_gender=}, {gender_res=}")
+            else:
+                logger.info(f"***Translation Check: {source_phrase=}, {target_phrase=}, {translation_res=}")
 
         # retrieve results from translation check
-        translation = translation_res.get('translation')
-        fuzzy_ratio = translation_res.get('fuzzy_ratio')
-        translation_error = translation_res.get('translation_error')
+        translation, fuzzy_ratio, translation_error = translation_res
+        translations[idx - 1] = translation
+        translation_errors[idx - 1] = translation_error
+        if translation_error is None:
+            fuzzy_ratios[idx - 1] = fuzzy_ratio
 
-        # retrieve results from gender check
+        # retrieve results from gender check, the gender results remain None if not a noun
         if is_source_noun:
-            is_gender_match = gender_res.get('is_gender_match')
-            lexical_gender = gender_res.get('lexical_gender')
-            gender_error = gender_res.get('gender_error')
-        else:
-            is_gender_match = None
-            lexical_gender = None
-            gender_error = None
-
-        # prepare error summary for dataframe - summarise and collect detail
-        error_res = analyse_errors(translation_error, fuzzy_ratio,
-                                   is_source_noun, gender_error, is_gender_match, lexical_gender)
-        is_needs_review = error_res.get('is_needs_review')
-        review_reason = error_res.get('review_reason')
-        review_detail = error_res.get('review_detail')
-
-        # set is_ok_to_display
-        is_ok_to_display = True if (not is_needs_review) or is_ignore_translation_error else False
-
-        logger.info(f"{is_needs_review=}, {review_reason=}, {review_detail=}, "
-                    f"{is_ignore_translation_error=}, {is_ok_to_display=}")
-
-        validation_results.append({
-            'source_phrase': source_phrase,
-            'target_phrase': target_phrase,
-            'target_phrase_short': target_phrase_short,
-            'source_language': source_language,
-            'target_language': target_language,
-            'is_source_noun': is_source_noun,
-            'source_noun': source_noun,
-            'source_noun_gender': source_noun_gender,
-            'is_ignore_translation_error': is_ignore_translation_error,
-            'source_phrase_no_diacritic': source_phrase_no_diacritic,
-            'translation': translation,
-            'fuzzy_ratio': fuzzy_ratio,
-            'is_gender_match': is_gender_match,
-            'lexical_gender': lexical_gender,
-            'is_needs_review': is_needs_review,
-            'review_reason': review_reason,
-            'review_detail': review_detail,
-            'is_ok_to_display': is_ok_to_display
-        })
-
-        # stop processing if word_limit reached
-        if word_limit and (idx == word_limit):
-            break
-
-    # create the validation results dataframe
-    dfv = pd.DataFrame(validation_results)
-
-    # set the data type of new boolean columns to bool
-    dfv.is_gender_match = dfv.is_gender_match.astype(bool)
-    dfv.is_needs_review = dfv.is_needs_review.astype(bool)
-    dfv.is_ok_to_display = dfv.is_ok_to_display.astype(bool)
+            is_gender_matches[idx - 1], lexical_genders[idx - 1], gender_errors[idx - 1] = gender_res
+
+    # create the validation results dataframe from the language columns and the results columns
+    # the unique phrase results are broadcast to all the phrases, in the checked order
+    dfv = pd.DataFrame({
+        'source_phrase': checked_df.source_phrase.to_numpy(),
+        'target_phrase': checked_df.target_phrase.to_numpy(),
+        'target_phrase_short': checked_df.target_phrase_short.to_numpy(),
+        'source_language': source_language,
+        'target_language': target_language,
+        'is_source_noun': checked_df.is_source_noun.to_numpy(),
+        'source_noun': checked_df.source_noun.to_numpy(),
+        'source_noun_gender': checked_df.source_noun_gender.to_numpy(),
+        'is_ignore_translation_error': checked_df.is_ignore_translation_error.to_numpy(),
+        'source_phrase_no_diacritic': checked_df.source_phrase_no_diacritic.to_numpy(),
+        'translation': translations[phrase_groups],
+        'fuzzy_ratio': fuzzy_ratios[phrase_groups],
+        'is_gender_match': pd.array(is_gender_matches[phrase_groups], dtype='boolean'),  # None if not a noun or not found
+        'lexical_gender': lexical_genders[phrase_groups]
+    })
+
+    # prepare error summary for dataframe - summarise and collect detail
+    error_res = analyse_errors(translation_errors[phrase_groups], dfv.fuzzy_ratio,
+                               dfv.is_source_noun, gender_errors[phrase_groups], dfv.is_gender_match, dfv.lexical_gender)
+    dfv['is_needs_review'] = error_res.get('is_needs_review')
+    dfv['review_reason'] = error_res.get('review_reason')
+    dfv['review_detail'] = error_res.get('review_detail')
+
+    # set is_ok_to_display
+    dfv['is_ok_to_display'] = ~dfv.is_needs_review | dfv.is_ignore_translation_error
+    logger.info(f"{dfv.is_needs_review.sum()=}, {dfv.is_ok_to_display.sum()=}")
 
     # validate the report dataframe schema against the ValidationReportDataSchema
     validate_report_dataframe_schema(dfv)
 
     try:
-        dfv.to_feather(output_filepath)
+        save_report_data_df_to_feather(dfv, output_filepath)
         print(f"Translation and Language check report saved to: {output_filepath}")
 
-        # Load the dataframe back from feather and re-validate schema
-        dfv = load_report_data_df_from_feather(output_filepath)
-        print(f"Language data successfully loaded and schema validated from: "
-              f"{output_filepath}")
+        # Load the dataframe back from feather and re-validate schema, if debugging
+        if logger.isEnabledFor(logging.DEBUG):
+            load_report_data_df_from_feather(output_filepath)
+            print(f"Language data successfully loaded and schema validated from: "
+                  f"{output_filepath}")
 
-        # Report on number of items that need review
+        # Report on number of items that need review, using the in-memory dataframe
         items_tot = len(dfv)
-        items_to_review = dfv[(dfv.is_ok_to_display != True)].source_phrase.count()
+        items_to_review = int((~dfv.is_ok_to_display).sum())
         print(f"Processed {items_tot} items, {items_to_review} need review")
 
     except Exception as e:
@@ -46,151 +46,55 @@ aire (f): area (e.g. service area near a motorway)
 import logging
 import re
 import os
+import numpy as np
 import pandas as pd
+import pyarrow.feather as feather
 import shutil
-import unidecode
 import data_tools.data_utils.data_config as data_config
 
 from datetime import datetime
 from pathlib import Path
-from data_tools.data_utils.data_schema import LanguageDataFrameType, validate_language_dataframe_schema
+from data_tools.data_utils.data_schema import (LanguageDataFrameType, validate_language_dataframe_schema,
+                                               generate_no_diacritic, CATEGORICAL_COLS)
 
 # setup logger
 logger = logging.getLogger(__name__)
 logging.basicConfig(format='%(asctime)s %(levelname)s %(module)s %(funcName)s %(message)s')
 logger.setLevel(logging.WARNING)
 
+# define the regex patterns, compiled once
+REGEX_BETWEEN_BRACKETS = re.compile(r'.+?\((.*)\)')  # pattern to match items between round brackets
+REGEX_NOUN_GENDER = re.compile(r'^(?P<source_noun>.+?)\s*\((?P<source_noun_gender>[mf])\)')  # noun and gender
+REGEX_IN_BRACKETS = re.compile(r'\([^()]*\)')  # pattern to match innermost round brackets, with contents
+
 # ------------------------------------------------------------------------------
 # functions
 # ------------------------------------------------------------------------------
 
 
-def extract_between_brackets(phrase: str):
-    """Return what is between round brackets in given phrase."""
-
-    # capture what is between the brackets
-    regex_pattern = re.compile(r'.+?\((.*)\)')
-    between_brackets = regex_pattern.match(phrase)
-
-    return between_brackets
-
-
-def extract_noun(source_phrase):
-    """Return noun and gender from given source phrase."""
-    source_is_noun = False
-    source_noun = None
-    source_noun_gender = None
-
-    # capture noun and gender using a regex
-    regex_gender = re.compile(r'^(?P<source_noun>.+?)\s*\((?P<source_noun_gender>[mf])\)')
-    regex_match_gender = regex_gender.match(source_phrase)
-
-    # extract the noun and gender (if present)
-    if regex_match_gender:
-        source_is_noun = True
-        source_noun = regex_match_gender.group('source_noun')
-        source_noun_gender = regex_match_gender.group('source_noun_gender')
-
-    return source_is_noun, source_noun, source_noun_gender
-
-
-def get_phrase_short(s, comment_marker='#', special_comment='# special comment'):
-    """Return tuple with shortened version of s and is_special_comment flag.
-
-    Return short_s, where short_s is s up to the comment_marker, stripped
-    of whitespace
-
-    If special_comment string found at end of s then set
-    is_special_comment to True, otherwise False
-
-    Assume that special_comment starts with the comment_marker, if not then
-    raise assertion error."""
-    # print(f"get_phrase_short({s=}, {comment_marker=}, {special_comment})")
-    assert special_comment.startswith(comment_marker), (
-        f"the special_comment '{special_comment}' should start "
-        f"with the comment_marker '{comment_marker}'"
-    )
-
-    is_special_comment = False
-    if s.find(comment_marker) != -1:
-        # print('found comment')
-        s_short = s.split(comment_marker)[0].strip()
-    else:
-        # print('no comment')
-        s_short = s
-
-    len_special_comment = len(special_comment)
-    if s[-len_special_comment:] == special_comment:
-        # print(f"found special comment {special_comment} at end of line")
-        is_special_comment = True
-
-    # print(f"ruturn ({s_short=}, {is_special_comment=})")
-    return s_short, is_special_comment
-
-
-def remove_str_in_brackets(s):
-    """Remove string(s) in round brackets from s and return updated s.
-
-     Also remove trailing whitespace after brackets removed.
-
-     Return s if no brackets found.
-     """
-    num_brackets = s.count('(')
-    for _i in range(num_brackets, 0, -1):
-        s = re.sub(r'\([^()]*\)', '', s).strip()
-
-    return s
-
-
-def clean(s):
-    """Return a clean s, without extraneous information.
-
-    Extraneous information is defined as:
-    1. sub-strings between (and including) round brackets '('
-    2. sub-strings after (and including) 'e.g'
-
-    Return clean_s, where clean_s is s without the extraneous
-    information, stripped of whitespace.
-
-    e.g.
-    s = 'basic string (containing extraneous information in brackets) e.g. and with extraneous info in example'
-    clean(s) -> 'basic string'
-    """
-    # remove sub-string(s) between round brackets, including brackets (if any)
-    s_clean = remove_str_in_brackets(s)
-
-    # remove sub-strings after and including 'e.g' (if any)
-    s_clean = s_clean.split('e.g')[0].strip()
-
-    return s_clean
-
-
-def remove_diacritic(s):
-    """
-    Return given string s with diacritics removed.
-
-    E.g.
-    remove_diacritic('être') -> 'etre'
-
-    Ref: based on https://realpython.com/python-sort-unicode-strings/
-    """
-    return unidecode.unidecode(s)
-
-
 def sort_and_remove_duplicates(df, words_csv, key_comment):
     """Sort and remove duplicates from given dataframe and words_csv."""
     logger.debug(f"started: sort_and_remove_duplicates()")
-    # sort dataframe, by ascending source phrase (ignoring diacritics)
-    df_sorted = df.sort_values(by=['source_phrase_no_diacritic'], ascending=True)\
-        .reset_index(drop=True)
-
-    # check if original dataframe is sorted
-    is_original_sorted = all(df.source_phrase_no_diacritic ==
-                             df_sorted.source_phrase_no_diacritic)
+    # check if original dataframe is sorted, by ascending source phrase (ignoring diacritics)
+    # i.e. each key is less than or equal to the next, so no sort is needed in the common case
+    keys = df.source_phrase_no_diacritic.to_numpy()
+    is_original_sorted = bool(np.all(keys[:-1] <= keys[1:]))
     logger.debug(f"{is_original_sorted=}")
 
+    # sort dataframe, if needed
+    # the sort order is computed once on the key column (stable, so equal keys keep their
+    # original order) and all the columns are then taken in that order
+    if is_original_sorted:
+        df_sorted = df.reset_index(drop=True)
+    else:
+        sort_order = np.argsort(keys, kind='stable')
+        df_sorted = df.take(sort_order).reset_index(drop=True)
+
     # check if original dataframe has duplicates
-    duplicated_count = df.duplicated().sum()
+    # the other columns are derived from the source and target phrase, so only these are compared
+    # the duplicated mask is computed once and used for the count, the record and the drop
+    duplicated_mask = df_sorted.duplicated(subset=['source_phrase', 'target_phrase'])
+    duplicated_count = duplicated_mask.sum()
     is_original_has_duplicates = False if duplicated_count == 0 else True
     logger.debug(f"{is_original_has_duplicates=}")
 
@@ -203,18 +107,19 @@ def sort_and_remove_duplicates(df, words_csv, key_comment):
     if is_original_has_duplicates:
         # save duplicate source_phrase and target_phrase with count to csv
         logger.debug("removing duplicates and saving record")
-        df_dups = df_sorted[['source_phrase', 'target_phrase']]
-        df_dups = df_dups[df_dups.duplicated()].groupby(df_dups.columns.tolist(),
-                                                        as_index=True).size()
+        # the counts are ordered by source_phrase and target_phrase
+        df_dups = df_sorted.loc[duplicated_mask, ['source_phrase', 'target_phrase']].value_counts(sort=False)
+        df_dups = df_dups.sort_index()
         words_csv_dup_marker = "_duplicates"
         words_dups_csv = f"{words_csv_fname}{words_csv_dup_marker}{words_csv_fext}"
         with open(file=words_dups_csv, mode='a', encoding='utf-8') as f:
+            # write the file info and the duplicates through the one open file
             file_info = f"# Duplicates from '{words_csv}' written at {timestamp}: \n"
             f.write(file_info)
-        df_dups.to_csv(path_or_buf=words_dups_csv, mode='a', header=False)
+            df_dups.to_csv(path_or_buf=f, header=False)
 
         # drop the duplicates from the dataframe
-        df_sorted = df_sorted.drop_duplicates(ignore_index=True)
+        df_sorted = df_sorted.loc[~duplicated_mask].reset_index(drop=True)
         print(f"Removed {duplicated_count} duplicates and "
               f"saved record of duplicated to '{words_dups_csv}'")
 
@@ -246,10 +151,9 @@ def sort_and_remove_duplicates(df, words_csv, key_comment):
                 f.write(f"{line}\n")
 
             # write the sorted source_phrase and target phrase from the dataframe
-            for _idx, (source_phrase, target_phrase) in \
-                    df_sorted[['source_phrase', 'target_phrase']].iterrows():
-                # print(f"{source_phrase}: {target_phrase}")
-                f.write(f"{source_phrase}: {target_phrase}\n")
+            f.writelines(f"{source_phrase}: {target_phrase}\n"
+                         for source_phrase, target_phrase in zip(df_sorted.source_phrase.to_numpy(),
+                                                                 df_sorted.target_phrase.to_numpy()))
 
         # manage the files
         shutil.move(words_csv, words_save_csv)  # save original
@@ -283,95 +187,132 @@ def convert_csv_to_dataframe(words_csv, deliminator=': ', encoding='utf-8'):
         ValueError: empty source or target phrase
     """
     logger.debug(f"convert_csv_to_dataframe({words_csv=}, {deliminator=}, {encoding=}")
-    src_phrase_l = []  # source phrase list
-    tgt_phrase_l = []  # target phrase list
     src_hdr = None  # source phrase header
     tgt_hdr = None  # target phrase header
     key_comment = []  # key comment at top of the file
     comment = []  # any comment or blank line in the file
-    regex_pattern = re.compile(r'.+?\((.*)\)')  # pattern to match items between round brackets
+    line_errors = []  # (line number, error message) for the invalid lines, the first is raised
 
+    # read the file in one go and split into lines (a final newline does not start another line)
     with open(words_csv, 'r', encoding=encoding) as file:
-        for idx, line in enumerate(file):
-            if line.startswith('#') or not line.strip():
-                # save comments and empty lines at top of file, otherwise ignore
-                comment.append(line.rstrip('\n'))
-
-                continue
-
-            if line.startswith('>'):  # header
-                if src_hdr:
-                    # header already set
-                    raise ValueError(f"header already set, "
-                                     f"didn't expect another at line number {idx}!")
-
-                # parse the header
-                comment.append(line.rstrip('\n'))
-                line = line.rstrip().partition(deliminator)
-                src_hdr = line[0][1:]  # ignore header marker
-                tgt_hdr = line[2]
-
-                # save key_comment
-                key_comment = comment.copy()
-                continue
-
-            # parse the phrase
-            line = line.rstrip().partition(deliminator)
-            # print(line)
-            if not line[0] or not line[2]:
-                raise ValueError(f"unexpected empty source or target value at line number {idx}: {line}!")
-
-            src_phrase, tgt_phrase = line[0], line[2]
-
-            # check for invalid gender value
-            between_brackets = regex_pattern.findall(src_phrase)
-            if between_brackets and 'm' not in between_brackets and 'f' not in between_brackets:
-                raise ValueError(f"invalid source phrase at line number {idx}, only the gender "
-                                 f"values 'm' or 'f' are allowed between the brackets: {src_phrase}")
-
-            # remove any caps at beginning of the source phrase
-            src_phrase = src_phrase[0].lower() + src_phrase[1:]
-
-            src_phrase_l.append(src_phrase)
-            tgt_phrase_l.append(tgt_phrase)
+        file_text = file.read()
+    lines = file_text.split('\n')
+    if file_text.endswith('\n'):
+        lines.pop()
+    lines = pd.Series(lines, dtype=object)
+
+    # classify the lines, comments and empty lines are ignored
+    is_comment = lines.str.startswith('#') | (lines.str.strip() == '')
+    is_header = ~is_comment & lines.str.startswith('>')
+    is_phrase = ~(is_comment | is_header)
+
+    # parse the comment and header lines, there are few so they are parsed line by line
+    for idx in np.flatnonzero(is_comment | is_header):
+        line = lines[idx]
+        if not is_header[idx]:
+            # save comments and empty lines at top of file, otherwise ignore
+            comment.append(line)
+            continue
+
+        if src_hdr:
+            # header already set
+            line_errors.append((idx, f"header already set, didn't expect another at line number {idx}!"))
+            break
+
+        # parse the header
+        comment.append(line)
+        line = line.rstrip().partition(deliminator)
+        src_hdr = line[0][1:]  # ignore header marker
+        tgt_hdr = line[2]
+
+        # save key_comment
+        key_comment = comment.copy()
+
+    # parse the phrase lines, all at once, splitting each line at the first deliminator
+    phrase_lines = lines[is_phrase].str.rstrip()
+    phrase_parts = phrase_lines.str.split(deliminator, n=1)
+    src_phrases = phrase_parts.str[0]
+    tgt_phrases = phrase_parts.str[1].fillna('')
+
+    # check for empty source or target phrase
+    is_empty = (src_phrases == '') | (tgt_phrases == '')
+    if is_empty.any():
+        idx = is_empty.idxmax()
+        line_errors.append((idx, f"unexpected empty source or target value at line number {idx}: "
+                                 f"{phrase_lines[idx].partition(deliminator)}!"))
+
+    # check for invalid gender value
+    # the regex is only run on the source phrases that contain a bracket
+    is_bracketed = src_phrases.str.contains('(', regex=False)
+    between_brackets = src_phrases[is_bracketed].str.extract(REGEX_BETWEEN_BRACKETS)[0]
+    between_brackets = between_brackets.reindex(src_phrases.index)  # NaN if no bracket
+    is_invalid_gender = ~is_empty & between_brackets.notna() & ~between_brackets.isin(['m', 'f'])
+    if is_invalid_gender.any():
+        idx = is_invalid_gender.idxmax()
+        line_errors.append((idx, f"invalid source phrase at line number {idx}, only the gender "
+                                 f"values 'm' or 'f' are allowed between the brackets: {src_phrases[idx]}"))
+
+    # raise the error for the first invalid line, if any
+    if line_errors:
+        raise ValueError(min(line_errors)[1])
 
     # check integrity
     if not src_hdr or not tgt_hdr:
         raise ValueError("no header found in file!")
 
-    # report on number of phrases parsed
-    print(f"Parsed {len(src_phrase_l)} phrases")
-
-    # create the dataframe with source and target phrases
-    df = pd.DataFrame(zip(src_phrase_l, tgt_phrase_l),
-                      columns=['source_phrase', 'target_phrase'])
+    # remove any caps at beginning of the source phrase
+    # only the (few) phrases with a changed first character are rebuilt
+    src_first_chars = src_phrases.str[0]
+    src_first_chars_lower = src_first_chars.str.lower()
+    is_first_char_changed = src_first_chars != src_first_chars_lower
+    src_phrases = src_phrases.mask(is_first_char_changed,
+                                   src_first_chars_lower[is_first_char_changed]
+                                   + src_phrases[is_first_char_changed].str[1:])
 
-    # add the languages to the dataframe
-    df['source_language'] = src_hdr
-    df['target_language'] = tgt_hdr
+    # report on number of phrases parsed
+    print(f"Parsed {len(src_phrases)} phrases")
 
-    # add derived data to the dataframe
+    # derive the data columns from the source and target phrases, then create the dataframe once
+    # the phrases are parsed using vectorised pandas string methods, rather than row by row
+    source_phrases = src_phrases.reset_index(drop=True)
+    target_phrases = tgt_phrases.reset_index(drop=True)
 
-    # parse the source phrase to add the noun and gender information
-    df[['is_source_noun', 'source_noun', 'source_noun_gender']] = \
-        list(df.source_phrase.apply(extract_noun))
+    # parse the source phrase to get the noun and gender information (None if not a noun)
+    source_noun_gender = source_phrases.str.extract(REGEX_NOUN_GENDER)
+    is_source_noun = source_noun_gender.source_noun.notna()
 
-    # parse the target phrase to add the initial shortened phrase
+    # parse the target phrase to get the initial shortened phrase, the text before any comment,
     # and the is_ignore_translation_error flag
-    df[['target_phrase_short', 'is_ignore_translation_error']] = \
-        list(df.target_phrase.apply(get_phrase_short,
-                                    comment_marker='#',
-                                    special_comment='# ignore translation error'))
-
-    # clean the shortened target phrase to remove extraneous info
-    df['target_phrase_short'] = df.target_phrase_short.apply(clean)
-
-    # add new column, the source_phrase with any diacritic removed
-    df['source_phrase_no_diacritic'] = df.source_phrase.apply(remove_diacritic)
-
-    # set the data type of new boolean columns to bool
-    df.is_source_noun = df.is_source_noun.astype(bool)
-    df.is_ignore_translation_error = df.is_ignore_translation_error.astype(bool)
+    target_phrase_short = target_phrases.str.split('#', n=1).str[0]
+    is_ignore_translation_error = target_phrases.str.endswith('# ignore translation error')
+
+    # clean the shortened target phrase to remove extraneous info, the sub-strings in round brackets and after 'e.g'
+    # remove sub-string(s) between round brackets, repeating until any nested brackets are removed
+    while True:
+        target_phrase_short_unbracketed = target_phrase_short.str.replace(REGEX_IN_BRACKETS, '', regex=True)
+        if target_phrase_short_unbracketed.equals(target_phrase_short):
+            break
+        target_phrase_short = target_phrase_short_unbracketed
+    # remove sub-strings after and including 'e.g' (if any)
+    target_phrase_short = target_phrase_short.str.split('e.g', n=1, regex=False).str[0].str.strip()
+
+    # create the dataframe with the source and target phrases, the languages and the derived data
+    # the language and gender columns are categorical, each row holds a small code rather than a string
+    # the flag columns are already bool, they are derived with notna() and str.endswith()
+    phrase_tot = len(source_phrases)
+    df = pd.DataFrame({
+        'source_phrase': source_phrases,
+        'target_phrase': target_phrases,
+        'source_language': pd.Categorical.from_codes(np.zeros(phrase_tot, dtype=np.int8), categories=[src_hdr]),
+        'target_language': pd.Categorical.from_codes(np.zeros(phrase_tot, dtype=np.int8), categories=[tgt_hdr]),
+        'is_source_noun': is_source_noun,
+        'source_noun': source_noun_gender.source_noun.where(is_source_noun, None),
+        'source_noun_gender': source_noun_gender.source_noun_gender.where(is_source_noun, None).astype(
+            pd.CategoricalDtype(CATEGORICAL_COLS['source_noun_gender'])),
+        'target_phrase_short': target_phrase_short,
+        'is_ignore_translation_error': is_ignore_translation_error,
+        'source_phrase_no_diacritic': generate_no_diacritic(source_phrases)  # source_phrase without diacritics
+    })
 
     # sort and remove duplicates from the dataframe and words_csv
     df = sort_and_remove_duplicates(df, words_csv, key_comment)
@@ -385,6 +326,10 @@ def convert_csv_to_dataframe(words_csv, deliminator=': ', encoding='utf-8'):
 def load_language_data_df_from_feather(feather_filepath: str) -> LanguageDataFrameType:
     """Loads the language dataFrame from a Feather file and validates its schema.
 
+    The Feather file is memory-mapped, so its pages are read on demand, and
+    converted to pandas without an intermediate copy. The categorical language
+    and gender columns are loaded with the 'category' dtype.
+
     Args:
         feather_filepath (str): Path to the Feather file.
 
@@ -397,7 +342,8 @@ def load_language_data_df_from_feather(feather_filepath: str) -> LanguageDataFra
         TypeError: If the loaded DataFrame does not conform to LanguageDataSchema.
     """
     try:
-        df = pd.read_feather(feather_filepath)
+        table = feather.read_table(feather_filepath, memory_map=True)
+        df = table.to_pandas(self_destruct=True, split_blocks=True, use_threads=True)
     except FileNotFoundError:
         raise FileNotFoundError(f"Feather file not found at {feather_filepath}")
     except Exception as e:
@@ -408,7 +354,8 @@ def load_language_data_df_from_feather(feather_filepath: str) -> LanguageDataFra
     return df  # xtype: LanguageDataFrameType
 
 
-def main(lang_csv_filepath: str, lang_feather_filepath: str = 'language_words.fea'):
+def main(lang_csv_filepath: str, lang_feather_filepath: str = 'language_words.fea',
+         is_force_conversion: bool = False):
     """Main function to convert CSV to dataframe and save as a Feather file.
 
     Orchestrates the conversion of a language CSV file to a Feather DataFrame.
@@ -416,14 +363,28 @@ def main(lang_csv_filepath: str, lang_feather_filepath: str = 'language_words.fe
         2. Saves the LanguageDataFrame to a Feather file for persistent storage.
         3. Loads the LanguageDataFrame back from the Feather file and validates its schema.
 
+    The conversion is skipped if the Feather file is up-to-date i.e. not older
+    than the CSV file, the existing Feather file is then only loaded and validated.
+
     Args:
         lang_csv_filepath (str): Path to the input CSV file.
         lang_feather_filepath (str, optional): Path to save LanguageDataFrame Feather file.
                                                Defaults to 'language_words.fea'.
+        is_force_conversion (bool, optional): Convert the CSV file even if the Feather file is up-to-date.
+                                              Defaults to False.
     """
     try:
+        # skip the conversion if the feather file is up-to-date
+        if (not is_force_conversion
+                and os.path.exists(lang_feather_filepath)
+                and os.path.getmtime(lang_feather_filepath) >= os.path.getmtime(lang_csv_filepath)):
+            _loaded_df = load_language_data_df_from_feather(lang_feather_filepath)
+            print(f"Language data is up-to-date, successfully loaded and schema validated from: "
+                  f"{lang_feather_filepath}")
+            return
+
         language_df = convert_csv_to_dataframe(lang_csv_filepath)
-        language_df.to_feather(lang_feather_filepath)
+        language_df.to_feather(lang_feather_filepath, **data_config.FEATHER_WRITE_KWARGS)
         print(f"Language data saved to: {lang_feather_filepath}")
 
         # Load the dataframe back from feather and re-validate schema
@@ -19,10 +19,9 @@ Use lazy % formatting in logging functions (...) [logging-fstring-interpolation]
 """
 import logging
 import streamlit as st
-from pathlib import Path
 from lang_learner_pages.account import login, change_nickname, remove_user, logout
-from utils.config import lang_pair_to_all_words
-from data_tools.data_utils.data_schema import load_report_data_df_from_feather
+from utils.page_utils import is_admin_user
+from utils.logging_utils import get_logger
 
 # set streamlit page config, must be the first streamlit command
 st.set_page_config(page_title="Language Learner App",
@@ -35,14 +34,9 @@ st.set_page_config(page_title="Language Learner App",
 
 # setup logger
 # the logger level can be set from set_log_level group in the streamlit secrets.toml
-logger = logging.getLogger(__name__)
 logging.basicConfig(format='%(asctime)s %(levelname)s %(module)s %(funcName)s %(message)s')
 # preferred format for print statements for DEBUG datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-this_file_stem = Path(__file__).stem
-if this_file_stem in st.secrets.set_log_level:
-    logger.setLevel(st.secrets.set_log_level[this_file_stem])
-else:
-    logger.setLevel(logging.WARNING)
+logger = get_logger(__name__, __file__)
 
 # ------------------------------------------------------------------------------
 # functions
@@ -61,30 +55,78 @@ def sel_lang_pair():
     return source_lang, target_lang
 
 
-@st.cache_data(show_spinner="Reading app data...")  # cache read of language df as this is expensive
-def get_lang_df(source_language, target_language):
-    """Return words dataframe for given source and target languages.
+def build_nav_pages(is_admin):
+    """Return the lang_learner_app navigation pages, as a dict of section name to list of pages.
 
-    The words dataframe is the output from the data_tools process pipleline.
-    It contains all the source and target language word pairs after the data has been cleansed
-    and the translation has been checked.
+    The Admin and In-development pages are only included for an admin user.
 
     Inputs:
-    source_language: str, source language e.g. French
-    target_language: str, target language e.g. English
+    is_admin: bool, True if user is an admin
 
     Return:
-    df: pd.DataFrame, translation report dataframe for given source and target language word pairs
+    nav_pages: dict, navigation pages for st.navigation
     """
-    logger.debug(f"call: get_lang_df({source_language=}, {target_language=})")
-
-    # load all words translation report feather file into a dataframe
-    words_file = lang_pair_to_all_words[(source_language, target_language)]
-    logger.debug(f"{words_file=}")
-    df = load_report_data_df_from_feather(words_file)
-
-    logger.debug(f"return: df, total of {len(df)} items loaded")
-    return df
+    logger.debug(f"call: build_nav_pages({is_admin=})")
+    # define lang_learner_app pages
+    # account pages
+    change_nickname_page = st.Page(
+        change_nickname,
+        title="Change Your Nickname", icon=":material/manage_accounts:")
+    remove_user_page = st.Page(
+        remove_user,
+        title="Remove Your User", icon=":material/person_remove:")
+    logout_page = st.Page(
+        logout,
+        title="Log Out", icon=":material/logout:")
+
+    # mini-app pages
+    word_match_page = st.Page(
+        "lang_learner_pages/word_match.py",
+        title="Word Match", icon=":material/match_word:", default=True)
+    top_scores_page = st.Page(
+        "lang_learner_pages/top_scores.py",
+        title="Top Scores", icon=":material/leaderboard:")
+    my_scores_page = st.Page(
+        "lang_learner_pages/my_scores.py",
+        title="My Scores", icon=":material/view_list:")
+    search_page = st.Page(
+        "lang_learner_pages/search.py",
+        title="Search", icon=":material/search:")
+
+    if not is_admin:
+        # standard page navigation
+        return {
+            "Account": [change_nickname_page, remove_user_page, logout_page],
+            "Mini-apps": [word_match_page, top_scores_page, my_scores_page, search_page]
+        }
+
+    # define the admin and in-development pages, these are only defined for an admin user
+    # admin pages
+    admin_enter_scores = st.Page(
+        "lang_learner_pages/admin_enter_scores.py",
+        title="Manual Entry of Scores", icon=":material/build_circle:")
+    admin_display_nicknames = st.Page(
+        "lang_learner_pages/admin_display_nicknames.py",
+        title="Display Nicknames Gsheet", icon=":material/build_circle:")
+    admin_display_scores = st.Page(
+        "lang_learner_pages/admin_display_scores.py",
+        title="Display Scores Gsheet", icon=":material/build_circle:")
+
+    # in-development pages
+    gender_match_page = st.Page(
+        "lang_learner_pages/gender_match.py",
+        title="Gender Match", icon=":material/group:")
+    prototype_page = st.Page(
+        "lang_learner_pages/prototype.py",
+        title="Prototype", icon=":material/group:")
+
+    # special page navigation with extras: Admin and In-development
+    return {
+        "Account": [change_nickname_page, remove_user_page, logout_page],
+        "Admin": [admin_enter_scores, admin_display_nicknames, admin_display_scores],
+        "In-development": [gender_match_page, prototype_page],
+        "Mini-apps": [word_match_page, top_scores_page, my_scores_page, search_page]
+    }
 
 
 def main():
@@ -101,75 +143,13 @@ def main():
         if "source_language" not in st.session_state and "target_language" not in st.session_state:
             st.session_state.source_language, st.session_state.target_language = sel_lang_pair()
 
-        # get words dataframe for given sourec and target language and save to session state
-        if "df_words" not in st.session_state:
-            st.session_state.df_words = get_lang_df(source_language=st.session_state.source_language,
-                                                    target_language=st.session_state.target_language)
-
-        # define lang_learner_app pages
-        # account pages
-        change_nickname_page = st.Page(
-            change_nickname,
-            title="Change Your Nickname", icon=":material/manage_accounts:")
-        remove_user_page = st.Page(
-            remove_user,
-            title="Remove Your User", icon=":material/person_remove:")
-        logout_page = st.Page(
-            logout,
-            title="Log Out", icon=":material/logout:")
-
-        # admin pages
-        admin_enter_scores = st.Page(
-            "lang_learner_pages/admin_enter_scores.py",
-            title="Manual Entry of Scores", icon=":material/build_circle:")
-        admin_display_nicknames = st.Page(
-            "lang_learner_pages/admin_display_nicknames.py",
-            title="Display Nicknames Gsheet", icon=":material/build_circle:")
-        admin_display_scores = st.Page(
-            "lang_learner_pages/admin_display_scores.py",
-            title="Display Scores Gsheet", icon=":material/build_circle:")
-
-        # in-development pages
-        gender_match_page = st.Page(
-            "lang_learner_pages/gender_match.py",
-            title="Gender Match", icon=":material/group:")
-        prototype_page = st.Page(
-            "lang_learner_pages/prototype.py",
-            title="Prototype", icon=":material/group:")
-
-        # mini-app pages
-        word_match_page = st.Page(
-            "lang_learner_pages/word_match.py",
-            title="Word Match", icon=":material/match_word:", default=True)
-        top_scores_page = st.Page(
-            "lang_learner_pages/top_scores.py",
-            title="Top Scores", icon=":material/leaderboard:")
-        my_scores_page = st.Page(
-            "lang_learner_pages/my_scores.py",
-            title="My Scores", icon=":material/view_list:")
-        search_page = st.Page(
-            "lang_learner_pages/search.py",
-            title="Search", icon=":material/search:")
-
         # configure lang_learner_app pages
-        if st.session_state.user_id in st.secrets.admin.admin_user_ids:
-            # special page navigation with extras: Admin and In-development
-            pg = st.navigation(
-                {
-                    "Account": [change_nickname_page, remove_user_page, logout_page],
-                    "Admin": [admin_enter_scores, admin_display_nicknames, admin_display_scores],
-                    "In-development": [gender_match_page, prototype_page],
-                    "Mini-apps": [word_match_page, top_scores_page, my_scores_page, search_page]
-                }
-            )
-        else:
-            # standard page navigation
-            pg = st.navigation(
-                {
-                    "Account": [change_nickname_page, remove_user_page, logout_page],
-                    "Mini-apps": [word_match_page, top_scores_page, my_scores_page, search_page]
-                }
-            )
+        # the navigation pages are built once per session (and user type), then reused on each rerun
+        is_admin = is_admin_user(st.session_state.user_id)
+        if st.session_state.get("nav_pages_is_admin") != is_admin:
+            st.session_state.nav_pages = build_nav_pages(is_admin)
+            st.session_state.nav_pages_is_admin = is_admin
+        pg = st.navigation(st.session_state.nav_pages)
 
         # go!
         pg.run()
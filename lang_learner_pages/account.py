@@ -3,20 +3,48 @@ Module: account.py
 Description: Contains logic for the account page covering login,
 change_nickname, remove_user and logout.
 """
-import logging
 import streamlit as st
-from pathlib import Path
 from utils.page_utils import save_page
-from utils.gsheet_utils import (load_nicknames_dict_from_gsheet, save_nickname_to_gsheet,
-                                read_nicknames_as_df_from_gsheet, save_nicknames_df_to_gsheet)
+from utils.gsheet_utils import (load_nicknames_dict_with_snapshot, save_nickname_to_gsheet,
+                                delete_nickname_from_gsheet)
+from utils.logging_utils import get_logger
 
 # setup logger
-logger = logging.getLogger(__name__)
-this_file_stem = Path(__file__).stem
-if this_file_stem in st.secrets.set_log_level:
-    logger.setLevel(st.secrets.set_log_level[this_file_stem])
-else:
-    logger.setLevel(logging.WARNING)
+logger = get_logger(__name__, __file__)
+
+# ------------------------------------------------------------------------------
+# Account nicknames functions
+# ------------------------------------------------------------------------------
+
+
+@st.cache_data(show_spinner=False, ttl=60*1)  # cache nicknames, shared by all sessions
+def load_nicknames_dict_cached():
+    """Return nicknames as a dictionary, cached for up to a minute.
+
+    The cache is cleared whenever a nickname is saved or removed by the app,
+    so that the next read includes the change. The nicknames are read from the
+    local snapshot file, if it is recent, rather than from the gsheet.
+    """
+    logger.debug(f"call: load_nicknames_dict_cached()")
+    return load_nicknames_dict_with_snapshot()
+
+
+@st.cache_data(show_spinner=False, ttl=60*1)  # cache lowercase nicknames, shared by all sessions
+def load_nicknames_lower_cached():
+    """Return set of the lowercase nicknames, cached for up to a minute.
+
+    The set is used for the case-insensitive check that a new nickname is unique.
+    """
+    logger.debug(f"call: load_nicknames_lower_cached()")
+    return frozenset(nickname.lower() for nickname in load_nicknames_dict_cached().values())
+
+
+def clear_nicknames_cache():
+    """Clear the cached nicknames, called after the nicknames gsheet is updated."""
+    logger.debug(f"call: clear_nicknames_cache()")
+    load_nicknames_dict_cached.clear()
+    load_nicknames_lower_cached.clear()
+
 
 # ------------------------------------------------------------------------------
 # Account login page functions
@@ -49,7 +77,7 @@ def login():
         if "user_nickname" not in st.session_state:
             # load the nicknames into a dict from the nicknames google sheet
             if "nicknames_dict" not in st.session_state:
-                st.session_state.nicknames_dict = load_nicknames_dict_from_gsheet()
+                st.session_state.nicknames_dict = load_nicknames_dict_cached()
 
             logger.debug(f"{st.session_state.nicknames_dict=}")
             if st.session_state.user_id in st.session_state.nicknames_dict:
@@ -65,6 +93,7 @@ def login():
                 # set the user's given name (from their auth data) as their nickname
                 logger.debug(f"Set user's given name '{st.session_state.user_given_name}' as their nickname")
                 save_nickname_to_gsheet(st.session_state.user_id, st.session_state.user_given_name)
+                clear_nicknames_cache()
                 st.session_state.user_nickname = st.session_state.user_given_name
                 logger.debug(f"Logged in with new nickname: '{st.session_state.user_nickname}'")
                 st.session_state.login_popup = (
@@ -75,10 +104,11 @@ def login():
             else:
                 # user must set a new unique nickname
                 logger.debug(f"User {st.session_state.user_id=} must set a new unique nickname")
-                new_nickname = ui_set_unique_nickname(st.session_state.nicknames_dict)
+                new_nickname = ui_set_unique_nickname(load_nicknames_lower_cached())
                 if new_nickname:
                     logger.debug(f"User set newly selected unique nickname '{new_nickname}' as their nickname")
                     save_nickname_to_gsheet(st.session_state.user_id, new_nickname)
+                    clear_nicknames_cache()
                     st.session_state.user_nickname = new_nickname
                     logger.debug(f"Logged in with new nickname: '{st.session_state.user_nickname}'")
                     st.session_state.login_popup = (
@@ -112,8 +142,7 @@ def logout():
 
     st.write("Log out from the app, all your information will be saved")
     if st.button("Log out"):
-        for key in list(st.session_state.keys()):
-            del st.session_state[key]
+        st.session_state.clear()
         st.logout()
         st.rerun()
 
@@ -121,9 +150,12 @@ def logout():
 # ------------------------------------------------------------------------------
 # Account change user's nickname page functions
 # ------------------------------------------------------------------------------
-def ui_set_unique_nickname(nicknames_dict):
-    """Prompt user to set a new unique nickname, validate and return."""
-    logger.debug(f"call: ui_set_unique_nickname({nicknames_dict=})")
+def ui_set_unique_nickname(nicknames_lower):
+    """Prompt user to set a new unique nickname, validate and return.
+
+    The nicknames_lower is the set of existing nicknames in lowercase.
+    """
+    logger.debug(f"call: ui_set_unique_nickname({nicknames_lower=})")
     st.write("Please select a nickname to use the app.")
     new_nickname = st.text_input("Nickname:")
     if st.button("Confirm selection"):
@@ -135,7 +167,7 @@ def ui_set_unique_nickname(nicknames_dict):
             logger.debug(f"Error {new_nickname=}: The nickname must have at least 2 characters. "
                          f"Please choose another.")
             st.error("The nickname must have at least 2 characters. Please choose another.")
-        elif new_nickname.lower() in [nname.lower() for nname in nicknames_dict.values()]:
+        elif new_nickname.lower() in nicknames_lower:
             logger.debug(f"Error {new_nickname=}: This nickname is already taken. Please choose another.")
             st.error("This nickname is already taken. Please choose another.")
         else:
@@ -145,9 +177,12 @@ def ui_set_unique_nickname(nicknames_dict):
     return None
 
 
-def ui_change_unique_nickname(current_nickname, nicknames_dict):
-    """Prompt user to set a new unique replacement nickname, validate and return."""
-    logger.debug(f"call: ui_change_unique_nickname({current_nickname=}, {nicknames_dict=})")
+def ui_change_unique_nickname(current_nickname, nicknames_lower):
+    """Prompt user to set a new unique replacement nickname, validate and return.
+
+    The nicknames_lower is the set of existing nicknames in lowercase.
+    """
+    logger.debug(f"call: ui_change_unique_nickname({current_nickname=}, {nicknames_lower=})")
 
     st.write("Please select a new nickname.")
     st.info(f"Your current nickname is: {current_nickname}")
@@ -165,7 +200,7 @@ def ui_change_unique_nickname(current_nickname, nicknames_dict):
             logger.debug(f"Error {new_nickname=}: The new nickname must have at least 2 characters. "
                          f"Please choose another.")
             st.error("The new nickname must not be the same as your current nickname. Please choose another.")
-        elif new_nickname.lower() in [nname.lower() for nname in nicknames_dict.values()]:
+        elif new_nickname.lower() in nicknames_lower:
             logger.debug(f"Error {new_nickname=}: This nickname is already taken. Please choose another.")
             st.error("This nickname is already taken. Please choose another.")
         else:
@@ -182,18 +217,19 @@ def change_nickname():
     _calling_page = save_page('change_nickname')
 
     # refresh the nicknames_dict with existing nicknames
-    st.session_state.nicknames_dict = load_nicknames_dict_from_gsheet()
+    st.session_state.nicknames_dict = load_nicknames_dict_cached()
 
     # prompt user to set a new unique nickname to replace current one
     logger.debug(f"User {st.session_state.user_id=} must set a new unique nickname, "
                  f"current nickname {st.session_state.user_nickname}")
     new_nickname = ui_change_unique_nickname(st.session_state.user_nickname,
-                                             st.session_state.nicknames_dict)
+                                             load_nicknames_lower_cached())
     if new_nickname:
         logger.debug(f"User set new unique nickname '{new_nickname}' "
                      f"to replace their their current nickname")
         # save changed nickname
         save_nickname_to_gsheet(st.session_state.user_id, new_nickname)
+        clear_nicknames_cache()
         st.session_state.user_nickname = new_nickname
         logger.debug(f"Logged in as: {st.session_state.user_nickname} "
                      f"({st.session_state.user_id})")
@@ -216,24 +252,11 @@ def remove_user():
     st.info(f"You are logged in as: {st.session_state.user_nickname} ({st.session_state.user_id})")
     st.write("Remove your user / nickname from the app and logout")
     if st.button("Remove"):
-        # get the latest nicknames as a dataframe
-        df_nicknames = read_nicknames_as_df_from_gsheet()
-        logger.debug(f"{df_nicknames=}")
-
-        # create an updated dataframe with the current user removed
-        df_updated = df_nicknames[df_nicknames["User_id"] != st.session_state.user_id]
-
-        # carry out a few integrity checks before updating the gsheet
-        assert not df_updated.duplicated().any(), f"should not be any duplicate rows in the dataframe! {df_updated=}"
-        assert not df_updated.User_id.duplicated().any(), f"should not be any duplicated User_ids! {df_updated=}"
-        assert not df_updated.Nickname.duplicated().any(), f"should not be any duplicated Nicknames! {df_updated=}"
-        assert df_updated.notnull().values.all(), f"should not be any empty values! {df_updated=}"
-
-        # save the updated dataframe
-        save_nicknames_df_to_gsheet(df_updated)
+        # delete the current user's row from the nicknames gsheet
+        delete_nickname_from_gsheet(st.session_state.user_id)
+        clear_nicknames_cache()
 
         # remove session_state keys and log out
-        for key in list(st.session_state.keys()):
-            del st.session_state[key]
+        st.session_state.clear()
         st.logout()
         st.rerun()
@@ -2,19 +2,13 @@
 Module: admin_display_nicknames.py
 Description: Contains logic for the Admin page to display the Nicknames gsheet.
 """
-import logging
 import streamlit as st
-from pathlib import Path
-from utils.gsheet_utils import read_nicknames_as_df_from_gsheet
+from utils.gsheet_utils import read_nicknames_as_df_from_gsheet, check_nicknames_df_integrity
 from utils.page_utils import save_page
+from utils.logging_utils import get_logger
 
 # setup logger
-logger = logging.getLogger(__name__)
-this_file_stem = Path(__file__).stem
-if this_file_stem in st.secrets.set_log_level:
-    logger.setLevel(st.secrets.set_log_level[this_file_stem])
-else:
-    logger.setLevel(logging.WARNING)
+logger = get_logger(__name__, __file__)
 
 
 def main():
@@ -27,6 +21,14 @@ def main():
     logger.debug(f"display {df_nicknames=}")
     st.dataframe(df_nicknames)
 
+    # audit the nicknames, the integrity is not checked when a user is removed
+    try:
+        check_nicknames_df_integrity(df_nicknames)
+        st.success("Nicknames integrity check passed", icon=":material/check:")
+    except AssertionError as e:
+        logger.error(f"Nicknames integrity check failed: {e}")
+        st.error(f"Nicknames integrity check failed: {e}")
+
 
 if __name__ == "__main__":
     main()
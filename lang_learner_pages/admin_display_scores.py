@@ -2,19 +2,13 @@
 Module: admin_display_scores.py
 Description: Contains logic for the Admin page to display the Scores gsheet.
 """
-import logging
 import streamlit as st
-from pathlib import Path
-from utils.gsheet_utils import read_scores_as_df_from_gsheet
+from utils.gsheet_utils import read_recent_scores
 from utils.page_utils import save_page
+from utils.logging_utils import get_logger
 
 # setup logger
-logger = logging.getLogger(__name__)
-this_file_stem = Path(__file__).stem
-if this_file_stem in st.secrets.set_log_level:
-    logger.setLevel(st.secrets.set_log_level[this_file_stem])
-else:
-    logger.setLevel(logging.WARNING)
+logger = get_logger(__name__, __file__)
 
 
 def main():
@@ -23,7 +17,9 @@ def main():
     # save page
     _calling_page = save_page('scores')
 
-    df_scores = read_scores_as_df_from_gsheet()
+    num_recent_scores = 200
+    df_scores = read_recent_scores(num_recent_scores)
+    st.caption(f"Showing the {len(df_scores)} most recent scores, the latest first")
 
     # calculate required height to display required number of rows (default is 10)
     # https://discuss.streamlit.io/t/st-dataframe-controlling-the-height-threshold-for-scolling/31769/5
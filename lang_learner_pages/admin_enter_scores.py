@@ -7,22 +7,15 @@ Limitations:
 variables. This is not usually a problem as admin enter scores is usually used to enter scores for miniapps
 that haven't yet been developed.
 """
-import logging
 import pandas as pd
 import streamlit as st
-from pathlib import Path
-from datetime import datetime
 from lang_learner_pages.top_scores import MINIAPPS_WITH_SCORES
-from utils.gsheet_utils import save_score_to_gsheet
+from utils.gsheet_utils import save_score_to_gsheet, save_scores_to_gsheet
 from utils.page_utils import save_page
+from utils.logging_utils import get_logger
 
 # setup logger
-logger = logging.getLogger(__name__)
-this_file_stem = Path(__file__).stem
-if this_file_stem in st.secrets.set_log_level:
-    logger.setLevel(st.secrets.set_log_level[this_file_stem])
-else:
-    logger.setLevel(logging.WARNING)
+logger = get_logger(__name__, __file__)
 
 
 def main():
@@ -41,18 +34,46 @@ def main():
     sel_miniapp = st.selectbox(label="Select miniapp for score", options=MINIAPPS_WITH_SCORES)
 
     sel_date = st.date_input("Enter date for score", max_value="today")
-    sel_time = st.time_input("Enter time for score").replace(microsecond=0)  # time without microseconds
-    sel_timestamp= pd.Timestamp(datetime.combine(sel_date, sel_time))
-
-    if st.button("Submit score"):
-        try:
-            save_score_to_gsheet(sel_user_id, sel_miniapp, sel_score, sel_timestamp)
-            logger.debug("Scores successfully updated")
-            st.info("Scores successfully updated")
-        except ValueError:
-            logger.error("ValueError caught: this record already exists in the scores")
-            st.error("this record already exists in the scores, please try again with different values")
-            st.stop()
+    sel_time = st.time_input("Enter time for score")
+    sel_timestamp = pd.Timestamp.combine(sel_date, sel_time).floor("s")  # timestamp without microseconds
+
+    # queue the scores to save them to the scores gsheet together, in one batch
+    is_queue_scores = st.checkbox("Queue instead of submit")
+    if "pending_scores" not in st.session_state:
+        st.session_state.pending_scores = []
+
+    if not is_queue_scores:
+        if st.button("Submit score"):
+            try:
+                save_score_to_gsheet(sel_user_id, sel_miniapp, sel_score, sel_timestamp)
+                logger.debug("Scores successfully updated")
+                st.info("Scores successfully updated")
+            except ValueError:
+                logger.error("ValueError caught: this record already exists in the scores")
+                st.error("this record already exists in the scores, please try again with different values")
+                st.stop()
+    else:
+        if st.button("Queue score"):
+            st.session_state.pending_scores.append((sel_user_id, sel_miniapp, sel_score, sel_timestamp))
+            logger.debug(f"Score queued, {len(st.session_state.pending_scores)=}")
+
+    # display and save the queued scores, if any
+    if st.session_state.pending_scores:
+        st.dataframe(pd.DataFrame(st.session_state.pending_scores,
+                                  columns=["User_id", "Miniapp", "Score", "Timestamp"]))
+        if st.button(f"Submit {len(st.session_state.pending_scores)} queued scores"):
+            try:
+                save_scores_to_gsheet(st.session_state.pending_scores)
+                logger.debug("Queued scores successfully added")
+                st.session_state.pending_scores = []
+                st.info("Queued scores successfully added")
+            except ValueError:
+                logger.error("ValueError caught: a queued record already exists in the scores")
+                st.error("a queued record already exists in the scores (or is repeated), "
+                         "please clear the queue and try again with different values")
+        if st.button("Clear queued scores"):
+            st.session_state.pending_scores = []
+            st.rerun()
 
 
 if __name__ == "__main__":
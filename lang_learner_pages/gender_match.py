@@ -2,18 +2,12 @@
 Module: gender_match.py
 Description: Contains logic for the Gender Match miniapp page.
 """
-import logging
 import streamlit as st
-from pathlib import Path
 from utils.page_utils import save_page
+from utils.logging_utils import get_logger
 
 # setup logger
-logger = logging.getLogger(__name__)
-this_file_stem = Path(__file__).stem
-if this_file_stem in st.secrets.set_log_level:
-    logger.setLevel(st.secrets.set_log_level[this_file_stem])
-else:
-    logger.setLevel(logging.WARNING)
+logger = get_logger(__name__, __file__)
 
 def main():
       """Main for gender match."""
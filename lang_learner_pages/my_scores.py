@@ -2,64 +2,58 @@
 Module: my_scores.py
 Description: Contains logic for the My Scores miniapp page.
 """
-import logging
 import streamlit as st
-from pathlib import Path
-from utils.gsheet_utils import read_scores_as_df_from_gsheet
-from utils.page_utils import save_page
+from utils.gsheet_utils import read_scores_by_user_and_miniapp_cached
+from utils.page_utils import save_page, is_admin_user
+from utils.logging_utils import get_logger
 
 # setup logger
-logger = logging.getLogger(__name__)
-this_file_stem = Path(__file__).stem
-if this_file_stem in st.secrets.set_log_level:
-    logger.setLevel(st.secrets.set_log_level[this_file_stem])
-else:
-    logger.setLevel(logging.WARNING)
+logger = get_logger(__name__, __file__)
 
 # define constants
-if st.session_state.user_id in st.secrets.admin.admin_user_ids:
-    MINIAPPS_WITH_SCORES = ['word_match', 'gender_match', 'other']
-else:
-    MINIAPPS_WITH_SCORES = ['word_match']
+# the admin check is a lookup in the cached frozenset of admin user ids
+MINIAPPS_WITH_SCORES = (('word_match', 'gender_match', 'other') if is_admin_user(st.session_state.get("user_id"))
+                        else ('word_match',))
+
+# define a dictionary to map from a miniapp friendly name to the miniapp name, and the friendly names
+MINIAPP_MAP = {m.replace('_', ' ').title(): m for m in MINIAPPS_WITH_SCORES}
+MINIAPP_FRIENDLY_NAMES = list(MINIAPP_MAP)
 
 
-# cache data for 1 minute
-@st.cache_data(show_spinner="Reading app data and building the table...", ttl=60*1)
 def build_my_scores_table(user_id, miniapp):
     """Return the sorted scores (highest first) for the given user and miniapp
+
+    The scores are looked up in the shared cache of the scores indexed (and sorted)
+    by user and miniapp.
     """
     logger.debug(f"call: build_my_scores_table({user_id=}, {miniapp=})")
 
-    # read the scores data into a dataframe
-    df_scores = read_scores_as_df_from_gsheet()
+    # read the (cached) scores data into a dataframe, indexed by user and miniapp
+    df_scores = read_scores_by_user_and_miniapp_cached()
 
-    # filter the scores dataframe for the user and miniapp, sorted by
+    # look up the scores for the user and miniapp, already sorted by
     # Score (highest) and Timestamp (earliest)
-    df_scores = df_scores[(df_scores.User_id == user_id) &
-                          (df_scores.Miniapp == miniapp)][["Score", "Timestamp"]] \
-        .sort_values(by=["Score", "Timestamp"], ascending=(False, True), ignore_index=True)
+    try:
+        df_scores = df_scores.loc[[(user_id, miniapp)], ["Score", "Timestamp"]].reset_index(drop=True)
+    except KeyError:
+        # no scores for the user and miniapp
+        df_scores = df_scores.iloc[:0][["Score", "Timestamp"]].reset_index(drop=True)
 
     logger.debug(f"return: {df_scores=}")
     return df_scores
 
 
-def main():
-    st.header("My Scores")
-    logger.debug(f"call: start my scores miniapp")
-    # save page
-    _calling_page = save_page('my_scores')
-
-    # create a dictionary to map from a miniapp friendly name to the miniapp name
-    miniapp_map = {m.replace('_', ' ').title(): m for m in MINIAPPS_WITH_SCORES}
-
+@st.fragment  # rerun only the fragment when the selected miniapp changes
+def display_my_scores():
+    """Display the user's scores for the selected miniapp."""
+    logger.debug(f"call: display_my_scores()")
     # select the miniapp
-    mini_app_friendly_names = list(miniapp_map.keys())
-    selection = st.radio(label="Selected Mini-app", options=mini_app_friendly_names, horizontal=True)
+    selection = st.radio(label="Selected Mini-app", options=MINIAPP_FRIENDLY_NAMES, horizontal=True)
     st.info(f"My scores for {selection}")
     logger.debug(f"user selected my scores for {selection=}")
 
     # build the my scores table (with nickname) for the selection
-    df_user_scores = build_my_scores_table(st.session_state.user_id, miniapp_map[selection])
+    df_user_scores = build_my_scores_table(st.session_state.user_id, MINIAPP_MAP[selection])
 
     # display the table
     if not df_user_scores.empty:
@@ -72,5 +66,15 @@ def main():
         st.write("No scores saved yet, try again later after using the mini-app.")
 
 
+def main():
+    st.header("My Scores")
+    logger.debug(f"call: start my scores miniapp")
+    # save page
+    _calling_page = save_page('my_scores')
+
+    # select the miniapp and display the user's scores
+    display_my_scores()
+
+
 if __name__ == "__main__":
     main()
@@ -2,19 +2,13 @@
 Module: prototype.py
 Description: Contains logic to prototype mini-app logic for cloud deployment.
 """
-import logging
 import streamlit as st
-from pathlib import Path
 from contextlib import contextmanager
 from utils.page_utils import save_page
+from utils.logging_utils import get_logger
 
 # setup logger
-logger = logging.getLogger(__name__)
-this_file_stem = Path(__file__).stem
-if this_file_stem in st.secrets.set_log_level:
-    logger.setLevel(st.secrets.set_log_level[this_file_stem])
-else:
-    logger.setLevel(logging.WARNING)
+logger = get_logger(__name__, __file__)
 
 
 # def fix_mobile_columns():
@@ -72,30 +66,21 @@ else:
 #         yield
 
 
-@contextmanager
-def st_columns_horizontal_fix_mobile(n=2):
-    """ Define n flex columns for mobile.
-
-    Inputs:
-    n: int, number of columns (defaults to 2)
-
-    Addresses issue on mobile where mobile solution for st.columns does not support two (or three)
-    buttons side-by-side horizontally, even though display is wide enough.
-
-    Streamlit have fix for this on the way: Flex layout #10895
-
-    ToDo: replace st_columns_horizontal_fix_mobile() when flex container available with horizontal support.
-    Based on:
-    https://gist.github.com/ddorn/decf8f21421728b02b447589e7ec7235
-
-    """
-    logger.debug(f"call: st_columns_horizontal_fix_mobile({n=})")
-    assert n > 0, f"Number of columns must be >0, given {n=}"
-    ratio_pcnt = f"{100/n:.3f}"
-    logger.debug(f"{ratio_pcnt=}")
+# the numbers of flex columns supported by st_columns_horizontal_fix_mobile()
+HFIX_NS = (2, 3, 4)
 
-    # define style to n flex cols (with a percentage of ratio_pcnt) for mobile
-    horizontal_style = """
+# define style for n flex cols for mobile, as a class for each supported n
+# the container is tagged by its marker's hfix-n{n} class, so each rule only matches its own containers
+_HFIX_N_CSS_TMPL = """
+    /* Buttons and their parent container all have a width of 704px, which we need to override */
+    div[data-testid="stVerticalBlock"]:has(> .element-container .hfix-n{n}) div {
+        / * width: max-content !important; */
+        width: calc({ratio_pcnt}% - 1rem) !important;
+        flex: 1 1 calc({ratio_pcnt}% - 1rem) !important;
+        min-width: calc({ratio_pcnt}% - 1rem) !important;
+        margin-top: auto;  /* fix equivalent of vertical_alignment="bottom" */
+    }"""
+_HFIX_CLASSES_CSS = """
 <style class="hide-element">
     /* Hides the style container and removes the extra spacing */
     .element-container:has(.hide-element) {
@@ -105,39 +90,71 @@ def st_columns_horizontal_fix_mobile(n=2):
         The selector for >.element-container is necessary to avoid selecting the whole
         body of the streamlit app, which is also a stVerticalBlock.
     */
-    div[data-testid="stVerticalBlock"]:has(> .element-container .horizontal-marker) {
+    div[data-testid="stVerticalBlock"]:has(> .element-container .hfix-marker) {
         display: flex;
         flex-direction: row !important;
         flex-wrap: wrap;
         /* gap: 0.5rem; */
         align-items: baseline;
-    }
-    /* Buttons and their parent container all have a width of 704px, which we need to override */
-    div[data-testid="stVerticalBlock"]:has(> .element-container .horizontal-marker) div {
-        / * width: max-content !important; */
-        width: calc({ratio_pcnt}% - 1rem) !important;
-        flex: 1 1 calc({ratio_pcnt}% - 1rem) !important;
-        min-width: calc({ratio_pcnt}% - 1rem) !important;
-        margin-top: auto;  /* fix equivalent of vertical_alignment="bottom" */
-    }
+    }""" + "".join(
+    _HFIX_N_CSS_TMPL.replace("{n}", str(n)).replace("{ratio_pcnt}", f"{100/n:.3f}") for n in HFIX_NS) + """
     /* Just an example of how you would style buttons, if desired */
-    div[data-testid="stVerticalBlock"]:has(> .element-container .horizontal-marker) button {
+    div[data-testid="stVerticalBlock"]:has(> .element-container .hfix-marker) button {
         border-color: green;
     }
 </style>
 """
-    # replace the actual ratio_pcnt in the html
-    horizontal_style = horizontal_style.replace("{ratio_pcnt}", str(ratio_pcnt))
-    logger.debug(f"{horizontal_style=}")
 
-    # apply the style and yield the horizontal marker
-    st.markdown(horizontal_style, unsafe_allow_html=True)
+
+# define the button width demos as (title, left button label format, right button label format)
+PROTOS = (
+    ("Proto2: Demo Custom CSS Width (4 chars)", "4 l{i}", "4 r{i}"),
+    ("Proto3: Use Container Width (8 chars)", "eight l{i}", "eight r{i}"),
+    ("Proto4: Use Container Width (16 chars)", "sixteen chr lft{i}", "sixteen chr rgt{i}"),
+    ("Proto6: Use Container Width (32 chars)", "thirtytwo32 thirtytwo chars lft{i}", "thirtytwo32 thirtytwo chars rgt{i}"),
+    ("Proto7: Use Container Width (31 chars)", "thirtyone_ thirtyone chars lft{i}", "thirtyone_ thirtyone chars rgt{i}"),
+)
+
+
+@contextmanager
+def st_columns_horizontal_fix_mobile(n=2):
+    """ Define n flex columns for mobile.
+
+    Inputs:
+    n: int, number of columns, one of HFIX_NS (defaults to 2)
+
+    Addresses issue on mobile where mobile solution for st.columns does not support two (or three)
+    buttons side-by-side horizontally, even though display is wide enough.
+
+    Streamlit have fix for this on the way: Flex layout #10895
+
+    The style for all the supported n (_HFIX_CLASSES_CSS) is emitted once per run by main(),
+    before the first call, each call writes just the horizontal marker with the class for n.
+
+    ToDo: replace st_columns_horizontal_fix_mobile() when flex container available with horizontal support.
+    Based on:
+    https://gist.github.com/ddorn/decf8f21421728b02b447589e7ec7235
+
+    """
+    logger.debug(f"call: st_columns_horizontal_fix_mobile({n=})")
+    assert n in HFIX_NS, f"Number of columns must be one of {HFIX_NS}, given {n=}"
+
+    # yield the horizontal marker for n, the style is already applied by main()
     with st.container():
-        st.markdown('<span class="hide-element horizontal-marker"></span>',
+        st.markdown(f'<span class="hide-element hfix-marker hfix-n{n}"></span>',
                     unsafe_allow_html=True)
         yield
 
 
+def st_section(title):
+    """Display a section separator and subheader with the given title, in one markdown element.
+
+    Inputs:
+    title: str, section subheader
+    """
+    st.markdown(f"---\n### {title}")
+
+
 def main():
     """Main for prototype."""
     st.header("Prototype")
@@ -145,6 +162,9 @@ def main():
     # save page
     _calling_page = save_page('scores')
 
+    # apply the horizontal styles, once per run, for all the st_columns_horizontal_fix_mobile() calls
+    st.markdown(_HFIX_CLASSES_CSS, unsafe_allow_html=True)
+
     # prototype display of buttons on mobile
     st.write("Aim: support two horizontal button on mobile devices")
 
@@ -162,58 +182,28 @@ def main():
         with col2:
             st.button(f"Fifteen chars r{i}", use_container_width=True)
 
-    st.write("---")
     # custom CSS
-    st.subheader("Proto1: Basic Demo Custom CSS, 15 chars")
+    st_section("Proto1: Basic Demo Custom CSS, 15 chars")
     with st_columns_horizontal_fix_mobile(2):
         st.button("15fteen charsl1", use_container_width=True)
 
         st.button("15fteen charsr1", use_container_width=True)
 
-    st.write("---")
-    st.subheader("Proto2: Demo Custom CSS Width (4 chars)")
-    for i in range(1, 2+1):
-        with st_columns_horizontal_fix_mobile(2):
-            st.button(f"4 l{i}", use_container_width=True)
-            st.button(f"4 r{i}", use_container_width=True)
-
-    st.write("---")
-    st.subheader("Proto3: Use Container Width (8 chars)")
-    for i in range(1, 2+1):
-        with st_columns_horizontal_fix_mobile(2):
-            st.button(f"eight l{i}", use_container_width=True)
-            st.button(f"eight r{i}", use_container_width=True)
-
-    st.write("---")
-    st.subheader("Proto4: Use Container Width (16 chars)")
-    for i in range(1, 2+1):
-        with st_columns_horizontal_fix_mobile(2):
-            st.button(f"sixteen chr lft{i}", use_container_width=True)
-            st.button(f"sixteen chr rgt{i}", use_container_width=True)
-
-    st.write("---")
-    st.subheader("Proto6: Use Container Width (32 chars)")
-    for i in range(1, 2+1):
-        with st_columns_horizontal_fix_mobile(2):
-            st.button(f"thirtytwo32 thirtytwo chars lft{i}", use_container_width=True)
-            st.button(f"thirtytwo32 thirtytwo chars rgt{i}", use_container_width=True)
-
-    st.write("---")
-    st.subheader("Proto7: Use Container Width (31 chars)")
-    for i in range(1, 2+1):
-        with st_columns_horizontal_fix_mobile(2):
-            st.button(f"thirtyone_ thirtyone chars lft{i}", use_container_width=True)
-            st.button(f"thirtyone_ thirtyone chars rgt{i}", use_container_width=True)
+    # two rows of two buttons for each width demo (see PROTOS)
+    for title, left_fmt, right_fmt in PROTOS:
+        st_section(title)
+        for i in range(1, 2+1):
+            with st_columns_horizontal_fix_mobile(2):
+                st.button(left_fmt.format(i=i), use_container_width=True)
+                st.button(right_fmt.format(i=i), use_container_width=True)
 
-    st.write("---")
-    st.subheader("Proto8: Use Container Width 3 cols (may need vertical alignment?)")
+    st_section("Proto8: Use Container Width 3 cols (may need vertical alignment?)")
     with st_columns_horizontal_fix_mobile(3):
         st.button("CNT 2:01 DN")
         st.metric("H1t", value=36)
         st.metric("M1ss", value=2)
 
-    st.write("---")
-    st.subheader("Proto8: Use Container Width 3 cols (may need vertical alignment?)")
+    st_section("Proto8: Use Container Width 3 cols (may need vertical alignment?)")
     with st_columns_horizontal_fix_mobile(3):
         st.button("CNT 2:02 DN")
         st.write(f"Hit: :green[35]")
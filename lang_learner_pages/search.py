@@ -2,19 +2,58 @@
 Module: search.py
 Description: Contains logic for the Search miniapp page.
 """
-import logging
+import numpy as np
 import streamlit as st
 import re
-from pathlib import Path
-from utils.page_utils import save_page
+from utils.page_utils import save_page, is_admin_user
+from utils.word_data import get_df_words, get_words_file_version
+from utils.logging_utils import get_logger
 
 # setup logger
-logger = logging.getLogger(__name__)
-this_file_stem = Path(__file__).stem
-if this_file_stem in st.secrets.set_log_level:
-    logger.setLevel(st.secrets.set_log_level[this_file_stem])
-else:
-    logger.setLevel(logging.WARNING)
+logger = get_logger(__name__, __file__)
+
+# define the key columns, displayed to all users
+KEY_COLS = ('source_phrase', 'target_phrase_short')
+
+# define the highest unicode code point, used as the upper bound of a starts with search
+MAX_CODE_POINT_CHAR = chr(0x10ffff)
+
+
+@st.cache_resource(show_spinner="Preparing search...")  # cache for the app process, per version of the words file
+def get_sorted_search_index(_df_words, words_file, words_file_mtime, what_col):
+    """Return the sorted lowercase values of the given words dataframe column and their row positions.
+
+    The sorted values allow a starts with search to find its matching range by binary
+    search rather than by a scan of all the values. The values are lowercased once, when
+    the index is built, so that the search is case-insensitive. The index is keyed on the
+    words file and its modification time, like the words dataframe itself.
+
+    Inputs:
+    _df_words: pd.DataFrame, words dataframe (not hashed, identified by the words file and its mtime)
+    words_file: str, path to the words feather file
+    words_file_mtime: float, modification time of the words file
+    what_col: str, column of the words dataframe to index
+
+    Return:
+    (sorted_values, positions): tuple of np.ndarray, the sorted lowercase values and their row positions
+    """
+    logger.debug(f"call: get_sorted_search_index({words_file=}, {words_file_mtime=}, {what_col=})")
+    values = _df_words[what_col].str.lower().to_numpy(dtype=object)
+    positions = np.argsort(values, kind='stable')
+    return values[positions], positions
+
+
+def search_starts_with(df_words, what_col, search_str):
+    """Return the row positions of the words dataframe where what_col starts with search_str.
+
+    The search is case-insensitive, search_str is expected in lowercase.
+    The positions are in the order of the dataframe rows.
+    """
+    logger.debug(f"call: search_starts_with({what_col=}, {search_str=})")
+    sorted_values, positions = get_sorted_search_index(df_words, *get_words_file_version(), what_col)
+    lo = np.searchsorted(sorted_values, search_str, side='left')
+    hi = np.searchsorted(sorted_values, search_str + MAX_CODE_POINT_CHAR, side='left')
+    return np.sort(positions[lo:hi])
 
 
 def main():
@@ -27,13 +66,15 @@ def main():
     # assign key vars from session state
     target_language = st.session_state.target_language
     source_language = st.session_state.source_language
-    df_words = st.session_state.df_words
+    df_words = get_df_words()  # shared by all sessions, read-only
 
     # determine what language to search (sidebar)
+    # each option maps to the column searched
+    what_lang_to_col = {f"{target_language} phrases": 'target_phrase_short',
+                        f"{source_language} phrases": 'source_phrase',
+                        f"{source_language} phrases (without diacritics)": 'source_phrase_no_diacritic'}
     what_lang = st.sidebar.radio(label="Select *what* to search:",
-                                 options=[f"{target_language} phrases",
-                                          f"{source_language} phrases",
-                                          f"{source_language} phrases (without diacritics)"],
+                                 options=list(what_lang_to_col),
                                  horizontal=False)
 
     # determine type of search (sidebar)
@@ -43,7 +84,7 @@ def main():
                                    horizontal=False)
 
     # determine what cols to display (sidebar)
-    if st.session_state.user_id in st.secrets.admin.admin_user_ids:
+    if is_admin_user(st.session_state.user_id):
         # admin user has option to see All cols
         display_cols = st.sidebar.radio(label="Select columns to display in results:",
                                         options=['Key', 'All'],
@@ -64,17 +105,13 @@ def main():
     if do_search:
         logger.debug(f"prepare search with inputs: {what_lang=}, {display_cols=}")
         # determine what columns to search in dataframe
-        if target_language in what_lang:
-            what_col = 'target_phrase_short'
-        elif 'diacritic' in what_lang:
-            what_col = 'source_phrase_no_diacritic'
-        else:
-            what_col = 'source_phrase'
+        # the search is case-insensitive
+        what_col = what_lang_to_col[what_lang]
 
         # select dataframe columns to display
         if display_cols == 'Key':
             # display only key cols
-            sel_cols = ['source_phrase', 'target_phrase_short']
+            sel_cols = list(KEY_COLS)
             sel_cols_map = {'source_phrase': source_language,
                             'target_phrase_short': target_language}
         else:
@@ -87,12 +124,14 @@ def main():
             logger.debug(f"search df_words using: {search_type=}, {what_col=}, {search_str=}, {sel_cols=}")
 
             # search words dataframe (based on search type)
+            # the rows and columns are selected in one step, without an intermediate copy of all the columns
             if 'Simple' in search_type:
-                df_srch = df_words[(df_words[what_col].str.startswith(pat=search_str))]\
-                    [sel_cols].reset_index(drop=True)
+                srch_positions = search_starts_with(df_words, what_col, search_str.lower())
+                df_srch = df_words.iloc[srch_positions, df_words.columns.get_indexer(sel_cols)]\
+                    .reset_index(drop=True)
             else:
-                df_srch = df_words[(df_words[what_col].str.contains(pat=search_str, regex=True))]\
-                    [sel_cols].reset_index(drop=True)
+                srch_mask = df_words[what_col].str.contains(pat=search_str, case=False, regex=True, na=False)
+                df_srch = df_words.loc[srch_mask, sel_cols].reset_index(drop=True)
 
             st.write("Results:")
             logger.debug(f"display df_srch using: {sel_cols_map=}")
@@ -102,8 +141,9 @@ def main():
 
             logger.debug(f"report found {len(df_srch)} items in {what_lang}")
             st.write(f"Found {len(df_srch)} items in {what_lang}")
-        except re.error as e:
-            logger.debug(f"exception re.error triggered: error in regular expression: {e}")
+        except (re.error, ValueError) as e:
+            # the pyarrow-backed string columns raise ArrowInvalid (a ValueError) for an invalid regex
+            logger.debug(f"exception {type(e).__name__} triggered: error in regular expression: {e}")
             st.error(f"error in regular expression: {e}")
 
 
@@ -5,54 +5,55 @@ Description: Contains logic for the Top Scores miniapp page.
 ToDo:
 - add bold styling when (if) supported by st.dataframe in future st.release.
 """
-import logging
 import streamlit as st
 import pandas as pd
-from pathlib import Path
-from utils.gsheet_utils import read_nicknames_as_df_from_gsheet, read_scores_as_df_from_gsheet
-from utils.page_utils import save_page
+from utils.gsheet_utils import read_nicknames_as_df_cached, read_scores_as_df_cached
+from utils.page_utils import save_page, is_admin_user
+from utils.logging_utils import get_logger
 
 # setup logger
-logger = logging.getLogger(__name__)
-this_file_stem = Path(__file__).stem
-if this_file_stem in st.secrets.set_log_level:
-    logger.setLevel(st.secrets.set_log_level[this_file_stem])
-else:
-    logger.setLevel(logging.WARNING)
+logger = get_logger(__name__, __file__)
 
 # define constants
-if st.session_state.user_id in st.secrets.admin.admin_user_ids:
-    MINIAPPS_WITH_SCORES = ['word_match', 'gender_match', 'other']
-else:
-    MINIAPPS_WITH_SCORES = ['word_match']
+# the admin check is a lookup in the cached frozenset of admin user ids
+MINIAPPS_WITH_SCORES = (('word_match', 'gender_match', 'other') if is_admin_user(st.session_state.get("user_id"))
+                        else ('word_match',))
+
+# define a dictionary to map from a miniapp friendly name to the miniapp name, and the friendly names
+MINIAPP_MAP = {m.replace('_', ' ').title(): m for m in MINIAPPS_WITH_SCORES}
+MINIAPP_FRIENDLY_NAMES = list(MINIAPP_MAP)
 
 
-# cache data for 1 minute
-@st.cache_data(show_spinner="Reading app data and building the table...", ttl=60*1)
 def build_top_scores_table(miniapp):
     """Return the sorted top scores table (highest first) for the given miniapp
+
+    The table is not cached, it is built from the cached scores and nicknames, so
+    that it includes a newly saved score (the cached reads are cleared on a save).
     """
     logger.debug(f"call: build_top_scores_table({miniapp=})")
 
-    # read the scores data into a dataframe
-    df_scores = read_scores_as_df_from_gsheet()
+    # read the (cached) scores data into a dataframe
+    df_scores = read_scores_as_df_cached()
 
-    # filter the scores dataframe for the miniapp, sorted by
-    # Score (highest), Timestamp (earliest) and User_id (alphabetical)
-    df_miniapp_scores = df_scores[(df_scores.Miniapp == miniapp)][["User_id", "Score", "Timestamp"]] \
-        .sort_values(by=["Score", "Timestamp", "User_id"], ascending=(False, True, True), ignore_index=True)
+    # filter the scores dataframe for the miniapp
+    # the rows and columns are selected in one step, without an intermediate copy of all the columns
+    df_miniapp_scores = df_scores.loc[df_scores.Miniapp == miniapp, ["User_id", "Score", "Timestamp"]]
 
-    # select each user's top score
-    df_miniapp_scores = df_miniapp_scores.loc[df_miniapp_scores.groupby('User_id')['Score'].idxmax()] \
+    # select each user's top score (earliest, if the top score is repeated) and then sort
+    # by Score (highest), Timestamp (earliest) and User_id (alphabetical), with a single sort
+    is_top_score = df_miniapp_scores.Score.eq(
+        df_miniapp_scores.groupby('User_id', sort=False)['Score'].transform('max'))
+    df_top_scores = df_miniapp_scores[is_top_score]
+    df_miniapp_scores = df_top_scores.loc[df_top_scores.groupby('User_id', sort=False)['Timestamp'].idxmin()] \
         .sort_values(by=["Score", "Timestamp", "User_id"], ascending=(False, True, True), ignore_index=True)
     logger.debug(f"{df_miniapp_scores=}")
 
     # read the nicknames and join the top scores with the user nicknames so that
     # the user-friendly nickname can be displayed instead of the user_id
-    df_nicknames = read_nicknames_as_df_from_gsheet()
+    df_nicknames = read_nicknames_as_df_cached()
     logger.debug(f"{df_nicknames=}")
     # include only scores that have an active user_id and nickname
-    df_table = df_miniapp_scores.merge(df_nicknames, on=['User_id'], how='inner')
+    df_table = df_miniapp_scores.merge(df_nicknames[["User_id", "Nickname"]], on=['User_id'], how='inner')
     df_table = df_table[["Nickname", "Score", "Timestamp"]]
     # add Position to the table, starting at 1 to create a league table
     df_table.index += 1
@@ -64,18 +65,21 @@ def build_top_scores_table(miniapp):
     return df_table
 
 
-def highlight_row_with_this_user_nickname(row: pd.Series):
-    """Return all items in row highlighted if row has this user's nickname.
+def style_rows_with_this_user_nickname(df: pd.DataFrame):
+    """Return the dataframe styler with all items in rows with this user's nickname highlighted.
 
     Highlight using Streamlit's backgound colour for row selection in light mode.
+    The style properties are set only on the matching rows (if any), not on every cell.
     """
-    if ('Nickname' in row.index and
-            row.Nickname == st.session_state.user_nickname):
-        # ToDo: add bold styling when (if) supported by st.dataframe in future st.release
-        # return ['background-color: lightyellow; font-weight: bold'] * len(row)
-        return ['background-color: rgba(251,233,234,255); color: black'] * len(row)
-    else:
-        return [''] * len(row)
+    styler = df.style
+    if 'Nickname' in df.columns:
+        is_this_user = df.Nickname.eq(st.session_state.user_nickname)
+        if is_this_user.any():
+            # ToDo: add bold styling when (if) supported by st.dataframe in future st.release
+            # add 'font-weight': 'bold' to the properties
+            styler = styler.set_properties(subset=pd.IndexSlice[df.index[is_this_user], :],
+                                           **{'background-color': 'rgba(251,233,234,255)', 'color': 'black'})
+    return styler
 
 
 def main():
@@ -84,24 +88,19 @@ def main():
     # save page
     _calling_page = save_page('top_scores')
 
-    # create a dictionary to map from a miniapp friendly name to the miniapp name
-    miniapp_map = {m.replace('_', ' ').title(): m for m in MINIAPPS_WITH_SCORES}
-
     # select the miniapp
-    mini_app_friendly_names = list(miniapp_map.keys())
-    selection = st.radio(label="Selected Mini-app", options=mini_app_friendly_names, horizontal=True)
+    selection = st.radio(label="Selected Mini-app", options=MINIAPP_FRIENDLY_NAMES, horizontal=True)
     st.info(f"Top scores for {selection}")
     logger.debug(f"user selected top scores for {selection=}")
 
     # build the top scores table (with nickname) for the selection
-    df_scores_table = build_top_scores_table(miniapp_map[selection])
+    df_scores_table = build_top_scores_table(MINIAPP_MAP[selection])
 
     # display the table
     if not df_scores_table.empty:
         logger.debug(f"display {df_scores_table=}")
         # display with this user's row highlighted
-        st.dataframe(df_scores_table
-                     .style.apply(highlight_row_with_this_user_nickname, axis=1),
+        st.dataframe(style_rows_with_this_user_nickname(df_scores_table),
                      hide_index=True)
 
         # party if user is top!
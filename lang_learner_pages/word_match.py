@@ -48,26 +48,21 @@ practice app
 - give option to report word pair data errors; could be saved to an errors file?
 
 """
-import logging
 import os
 import pandas as pd
 import streamlit as st
 from dataclasses import dataclass
 from random import shuffle
-from pathlib import Path
 from contextlib import contextmanager
 from utils.gsheet_utils import save_score_to_gsheet
 from utils.st_countdown import st_countdown
-from utils.page_utils import save_page
+from utils.page_utils import save_page, is_admin_user
 from utils.gsheet_utils import read_scores_as_df_from_gsheet
+from utils.word_data import get_df_words
+from utils.logging_utils import get_logger
 
 # setup logger
-logger = logging.getLogger(__name__)
-this_file_stem = Path(__file__).stem
-if this_file_stem in st.secrets.set_log_level:
-    logger.setLevel(st.secrets.set_log_level[this_file_stem])
-else:
-    logger.setLevel(logging.WARNING)
+logger = get_logger(__name__, __file__)
 
 # define global constants to control dynamic behaviour
 COUNTDOWN_FROM = 120  # total seconds to countdown from to match word pairs
@@ -784,7 +779,7 @@ def main():
     # determine max word length (admin can over-ride)
     max_word_len = MAX_WORD_LEN_FOR_MOBILE  # default
     if ("word_pairs_shuffled" not in st.session_state and
-            st.session_state.user_id in st.secrets.admin.admin_user_ids and
+            is_admin_user(st.session_state.user_id) and
             'word_match_max_word_len' in st.secrets.admin_overide):
         # admin has over-ridden default
         try:
@@ -798,7 +793,7 @@ def main():
     # get the list of all the word pairs, shuffled, for the selected source and target language
     if "word_pairs_shuffled" not in st.session_state:
         st.session_state.word_pairs_shuffled = get_shuffled_word_pairs(
-            df_words=st.session_state.df_words,
+            df_words=get_df_words(),
             max_word_len=max_word_len)
 
     # get user's high score for word match
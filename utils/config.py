@@ -18,6 +18,9 @@ DATA_DIR_PATH = os.path.join(PROJECT_ROOT, "data")
 FRENCH_ENGLISH_WORDS_TLCHK_FEA = os.path.join(
     DATA_DIR_PATH, "fr_en_words_tlchk_v1.fea")
 
+# Local snapshot of the nicknames gsheet (not committed, it contains user ids)
+NICKNAMES_SNAPSHOT_JSON = os.path.join(DATA_DIR_PATH, "_nicknames_snapshot.json")
+
 # Define mapping dict from (source_language, target_language) to
 # the *words_tlchk.fea file
 lang_pair_to_all_words = {
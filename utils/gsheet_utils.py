@@ -2,19 +2,18 @@
 Module: uils/gsheet_utils.py
 Description: Contains utilities handling interface to Google sheet files.
 """
-import logging
+import json
+import os
+import time
+import gspread
 import pandas as pd
 import streamlit as st
-from pathlib import Path
 from streamlit_gsheets import GSheetsConnection
+from utils.config import NICKNAMES_SNAPSHOT_JSON
+from utils.logging_utils import get_logger
 
 # setup logger
-logger = logging.getLogger(__name__)
-this_file_stem = Path(__file__).stem
-if this_file_stem in st.secrets.set_log_level:
-    logger.setLevel(st.secrets.set_log_level[this_file_stem])
-else:
-    logger.setLevel(logging.WARNING)
+logger = get_logger(__name__, __file__)
 
 # ------------------------------------------------------------------------------
 # Functions related to nickname gsheet
@@ -39,6 +38,17 @@ def read_nicknames_as_df_from_gsheet():
         st.stop()
 
 
+@st.cache_data(show_spinner="Reading app data...", ttl=60*5)  # cache nicknames for 5 minutes, shared by all pages
+def read_nicknames_as_df_cached():
+    """Return the nicknames as a dataframe, cached for up to 5 minutes.
+
+    Use for displaying nicknames. The cache is cleared whenever the app updates
+    the nicknames gsheet, so that the next read includes the change.
+    """
+    logger.debug(f"call: read_nicknames_as_df_cached()")
+    return read_nicknames_as_df_from_gsheet()
+
+
 @st.cache_data(show_spinner="Saving app data...", ttl=0)  # replace unfriendly gsheet spinner
 def save_nicknames_df_to_gsheet(df):
     """Save the given dataframe to the nicknames gsheet."""
@@ -55,6 +65,43 @@ def save_nicknames_df_to_gsheet(df):
         st.stop()
 
 
+@st.cache_resource  # cache for the app process, the connection secrets are fixed in the streamlit secrets
+def open_gsheet_spreadsheet(connection_name):
+    """Return the gspread spreadsheet of the given gsheet connection.
+
+    The gspread client is authorised with the service account secrets of the
+    connection, the same secrets used by the GSheetsConnection, and the
+    spreadsheet is opened from the connection's spreadsheet url (or key).
+    """
+    logger.debug(f"call: open_gsheet_spreadsheet({connection_name=})")
+    secrets_dict = st.secrets["connections"][connection_name].to_dict()
+    spreadsheet = secrets_dict.pop("spreadsheet")
+    secrets_dict.pop("worksheet", None)  # not part of the service account info
+    client = gspread.service_account_from_dict(secrets_dict)
+    if spreadsheet.startswith("https://"):
+        return client.open_by_url(spreadsheet)
+    return client.open_by_key(spreadsheet)
+
+
+def select_gsheet_worksheet(connection_name, worksheet="Sheet1"):
+    """Return the gspread worksheet of the given gsheet connection.
+
+    The worksheet allows targeted row updates (e.g. delete a row) rather
+    than clearing and rewriting the whole sheet.
+    """
+    logger.debug(f"call: select_gsheet_worksheet({connection_name=}, {worksheet=})")
+    return open_gsheet_spreadsheet(connection_name).worksheet(worksheet)
+
+
+def check_nicknames_df_integrity(df):
+    """Check integrity of the given nicknames dataframe, raise AssertionError if check fails."""
+    logger.debug(f"call: check_nicknames_df_integrity({df=})")
+    assert not df.duplicated().any(), f"should not be any duplicate rows in the dataframe! {df=}"
+    assert not df.User_id.duplicated().any(), f"should not be any duplicated User_ids! {df=}"
+    assert not df.Nickname.duplicated().any(), f"should not be any duplicated Nicknames! {df=}"
+    assert df.notnull().values.all(), f"should not be any empty values! {df=}"
+
+
 def load_nicknames_dict_from_gsheet():
     """Return nicknames as a dictionary."""
     logger.debug(f"call: load_nicknames_dict_from_gsheet()")
@@ -67,6 +114,48 @@ def load_nicknames_dict_from_gsheet():
     return nicknames_dict
 
 
+def load_nicknames_dict_with_snapshot(max_age=60*1):
+    """Return nicknames as a dictionary, from the local snapshot file if it is recent.
+
+    The snapshot avoids a read of the nicknames gsheet e.g. when the app is restarted.
+    If the snapshot is missing or older than max_age seconds then the nicknames are
+    read from the gsheet and the snapshot is refreshed. The snapshot is removed
+    whenever the app updates the nicknames gsheet.
+    """
+    logger.debug(f"call: load_nicknames_dict_with_snapshot({max_age=})")
+    try:
+        if time.time() - os.path.getmtime(NICKNAMES_SNAPSHOT_JSON) < max_age:
+            with open(NICKNAMES_SNAPSHOT_JSON, encoding='utf-8') as f:
+                nicknames_dict = json.load(f)
+            logger.debug(f"return: nicknames from snapshot, {nicknames_dict=}")
+            return nicknames_dict
+    except (OSError, ValueError):
+        pass  # no usable snapshot, read the gsheet
+
+    nicknames_dict = load_nicknames_dict_from_gsheet()
+
+    # refresh the snapshot, written to a temporary file and then moved so that it is never partial
+    try:
+        snapshot_tmp = f"{NICKNAMES_SNAPSHOT_JSON}.tmp"
+        with open(snapshot_tmp, mode='w', encoding='utf-8') as f:
+            json.dump(nicknames_dict, f, ensure_ascii=False)
+        os.replace(snapshot_tmp, NICKNAMES_SNAPSHOT_JSON)
+    except OSError as e:
+        logger.warning(f"unable to save nicknames snapshot: {e}")
+
+    logger.debug(f"return: {nicknames_dict=}")
+    return nicknames_dict
+
+
+def remove_nicknames_snapshot():
+    """Remove the local snapshot of the nicknames gsheet, if any."""
+    logger.debug(f"call: remove_nicknames_snapshot()")
+    try:
+        os.remove(NICKNAMES_SNAPSHOT_JSON)
+    except FileNotFoundError:
+        pass
+
+
 def save_nickname_to_gsheet(user_id, nickname):
     """Save given user_id and nickname to nicknames gsheet."""
     logger.debug(f"call: save_nickname_to_gsheet({user_id=}, {nickname=})")
@@ -84,13 +173,36 @@ def save_nickname_to_gsheet(user_id, nickname):
     df_updated = df_updated.sort_values(by=['User_id', 'Nickname'], ascending=(True, True), ignore_index=True)
 
     # carry out a few integrity checks before updating the gsheet
-    assert not df_updated.duplicated().any(), f"should not be any duplicate rows in the dataframe! {df_updated=}"
-    assert not df_updated.User_id.duplicated().any(), f"should not be any duplicated User_ids! {df_updated=}"
-    assert not df_updated.Nickname.duplicated().any(), f"should not be any duplicated Nicknames! {df_updated=}"
-    assert df_updated.notnull().values.all(), f"should not be any empty values! {df_updated=}"
+    check_nicknames_df_integrity(df_updated)
 
     # save the updated dataframe to nicknames
     save_nicknames_df_to_gsheet(df_updated)
+    remove_nicknames_snapshot()  # the snapshot is now out of date
+    read_nicknames_as_df_cached.clear()
+
+
+def delete_nickname_from_gsheet(user_id):
+    """Delete the row with the given user_id from the nicknames gsheet.
+
+    Only the user's row is deleted, the rest of the sheet is not rewritten.
+    Do nothing if the user_id is not found.
+    """
+    logger.debug(f"call: delete_nickname_from_gsheet({user_id=})")
+    assert user_id, f"error: user_id should not be null, {user_id=}"
+    try:
+        worksheet = select_gsheet_worksheet("gsheets-nicknames")
+        cell = worksheet.find(user_id, in_column=1)  # User_id is the first column
+        if cell is None:
+            logger.debug(f"{user_id=} not found in nicknames")
+            return
+        worksheet.delete_rows(cell.row)
+        remove_nicknames_snapshot()  # the snapshot is now out of date
+        read_nicknames_as_df_cached.clear()
+    except Exception as e:
+        logger.error(f"Exception: Error deleting nickname from Google Sheet: {e}, report to app admin")
+        st.error("")
+        st.error(f"Error deleting nickname from Google Sheet: {e}, report to app admin")
+        st.stop()
 
 # ------------------------------------------------------------------------------
 # Functions related to scores gsheet
@@ -123,6 +235,51 @@ def read_scores_as_df_from_gsheet():
         st.stop()
 
 
+@st.cache_data(show_spinner="Reading app data...", ttl=60*5)  # cache scores for 5 minutes, shared by all pages
+def read_scores_as_df_cached():
+    """Return the scores as a dataframe, cached for up to 5 minutes.
+
+    Use for displaying scores. The cache is cleared whenever a score is saved
+    by the app, so that the next read includes the new score.
+
+    The Miniapp column is categorical, there are only a few miniapps, so
+    filtering by miniapp compares small integer codes rather than strings.
+    The other columns are held in compact dtypes: User_id as a string, Score as
+    int32 and Timestamp with a resolution of seconds (as saved in the gsheet).
+    """
+    logger.debug(f"call: read_scores_as_df_cached()")
+    df = read_scores_as_df_from_gsheet()
+    return df[["User_id", "Miniapp", "Score", "Timestamp"]].astype(
+        {"User_id": "string", "Miniapp": "category", "Score": "int32", "Timestamp": "datetime64[s]"})
+
+
+@st.cache_data(show_spinner="Reading app data...", ttl=60*5)  # cache indexed scores for 5 minutes
+def read_scores_by_user_and_miniapp_cached():
+    """Return the scores as a dataframe indexed by User_id and Miniapp, cached for up to 5 minutes.
+
+    The scores are sorted once by User_id, Miniapp, Score (highest) and Timestamp (earliest),
+    so a user's scores for a miniapp can be looked up in the index already sorted.
+    The cache is cleared whenever a score is saved by the app.
+    """
+    logger.debug(f"call: read_scores_by_user_and_miniapp_cached()")
+    df_scores = read_scores_as_df_cached()
+    return (df_scores
+            .sort_values(by=['User_id', 'Miniapp', 'Score', 'Timestamp'], ascending=(True, True, False, True))
+            .set_index(['User_id', 'Miniapp']))
+
+
+def read_recent_scores(n=200):
+    """Return the n most recent scores as a dataframe, the latest first.
+
+    The scores gsheet is sorted by User_id, not by Timestamp, so the most recent
+    scores are selected from the cached scores (see read_scores_as_df_cached())
+    rather than from the end of the sheet.
+    """
+    logger.debug(f"call: read_recent_scores({n=})")
+    df_scores = read_scores_as_df_cached()
+    return df_scores.sort_values(by='Timestamp', ascending=False, kind='stable').head(n).reset_index(drop=True)
+
+
 @st.cache_data(show_spinner="Saving app data...", ttl=0)  # replace unfriendly gsheet spinner
 def save_scores_df_to_gsheet(df):
     """Save the given dataframe to the scores gsheet."""
@@ -141,28 +298,40 @@ def save_scores_df_to_gsheet(df):
 def save_score_to_gsheet(user_id, miniapp, score, timestamp):
     """Save given user_id, miniapp, score and timestamp to scores gsheet."""
     logger.debug(f"call: save_score_to_gsheet({user_id=}, {miniapp=}, {score=}, {timestamp=})")
-    assert score >= 0, f"unexpected error: score should >= 0, {score=}"
-    assert user_id and miniapp and timestamp, (
-        f"unexpected error: value should not be null, {user_id=}, {miniapp=}, {timestamp=}")
+    save_scores_to_gsheet([(user_id, miniapp, score, timestamp)])
+
+
+def save_scores_to_gsheet(scores):
+    """Save the given scores to the scores gsheet in one write.
+
+    Each score is a tuple of (user_id, miniapp, score, timestamp). The scores are
+    combined with the latest scores and the whole sheet is saved once, sorted by
+    User_id, Miniapp, Score (highest) and Timestamp (earliest), so the scores gsheet
+    is always kept in this order.
+
+    Raises:
+        ValueError: if a score is already present in the scores or is repeated in the given scores
+    """
+    logger.debug(f"call: save_scores_to_gsheet({scores=})")
+    for user_id, miniapp, score, timestamp in scores:
+        assert score >= 0, f"unexpected error: score should >= 0, {score=}"
+        assert user_id and miniapp and timestamp, (
+            f"unexpected error: value should not be null, {user_id=}, {miniapp=}, {timestamp=}")
 
     # read latest scores data
     df_scores = read_scores_as_df_from_gsheet()
 
-    # raise error if record already in dataframe
-    logger.debug(f"check for duplicate: {user_id=}, {miniapp=}, {score=}, {timestamp}")
-    if ((df_scores.User_id == user_id) &
-            (df_scores.Miniapp == miniapp) &
-            (df_scores.Score == score) &
-            (df_scores.Timestamp == timestamp)).any():
-        logger.debug("raise ValueError detected, this record is already present in scores")
-        raise ValueError('this record is already present in scores')
+    # raise error if a record is already in the latest scores data or is repeated
+    df_new_scores = pd.DataFrame(scores, columns=["User_id", "Miniapp", "Score", "Timestamp"])
+    logger.debug(f"check for duplicates: {df_new_scores=}")
+    if (df_new_scores.duplicated().any() or
+            not df_new_scores.merge(df_scores, on=["User_id", "Miniapp", "Score", "Timestamp"]).empty):
+        logger.debug("raise ValueError detected, a record is already present in scores")
+        raise ValueError('a record is already present in scores')
 
-    # create updated dataframe that combines existing scores dataframe with the new record
+    # create updated dataframe that combines existing scores dataframe with the new records
     # noinspection PyUnreachableCode
-    df_updated = pd.concat([
-        df_scores,
-        pd.DataFrame([{"User_id": user_id, "Miniapp": miniapp, "Score": score, "Timestamp": timestamp}])],
-        ignore_index=True)
+    df_updated = pd.concat([df_scores, df_new_scores], ignore_index=True)
     df_updated = df_updated.sort_values(by=['User_id', "Miniapp", 'Score', "Timestamp"],
                                         ascending=(True, True, False, True), ignore_index=True)
     df_updated['Timestamp'] = df_updated.Timestamp.dt.strftime('%d/%m/%Y %H:%M:%S')
@@ -172,3 +341,5 @@ def save_score_to_gsheet(user_id, miniapp, score, timestamp):
     assert df_updated.notnull().values.all(), f"should not be any empty values! {df_updated=}"
 
     save_scores_df_to_gsheet(df_updated)
+    read_scores_as_df_cached.clear()  # the cached scores are now out of date
+    read_scores_by_user_and_miniapp_cached.clear()
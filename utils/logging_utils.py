@@ -0,0 +1,30 @@
+"""
+Module: utils/logging_utils.py
+Description: Contains utilities for setting up the module loggers.
+"""
+import functools
+import logging
+import streamlit as st
+from pathlib import Path
+
+
+@functools.lru_cache(maxsize=None)  # cache the log level for each module file
+def get_log_level(file_path):
+    """Return the log level for the given module file path.
+
+    The log level can be set, by module file stem, in the set_log_level group in
+    the streamlit secrets.toml, otherwise (or if there is no set_log_level group)
+    the log level is WARNING.
+    """
+    this_file_stem = Path(file_path).stem
+    return st.secrets.get("set_log_level", {}).get(this_file_stem, logging.WARNING)
+
+
+def get_logger(name, file_path):
+    """Return the logger with the given name, with its level set for the given module file path.
+
+    Usage: logger = get_logger(__name__, __file__)
+    """
+    logger = logging.getLogger(name)
+    logger.setLevel(get_log_level(file_path))
+    return logger
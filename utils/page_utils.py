@@ -3,17 +3,11 @@ Module: uils/page_utils.py
 Description: Contains utilities for use in Streamlit pages.
 """
 
-import logging
 import streamlit as st
-from pathlib import Path
+from utils.logging_utils import get_logger
 
 # setup logger
-logger = logging.getLogger(__name__)
-this_file_stem = Path(__file__).stem
-if this_file_stem in st.secrets.set_log_level:
-    logger.setLevel(st.secrets.set_log_level[this_file_stem])
-else:
-    logger.setLevel(logging.WARNING)
+logger = get_logger(__name__, __file__)
 
 
 def save_page(page_name):
@@ -33,3 +27,15 @@ def save_page(page_name):
 
     logger.debug(f"return: {previous_page_name=}")
     return previous_page_name
+
+
+@st.cache_resource  # cache for the app process, the admin user ids are fixed in the streamlit secrets
+def get_admin_user_ids():
+    """Return the admin user ids, from the streamlit secrets, as a frozenset."""
+    logger.debug(f"call: get_admin_user_ids()")
+    return frozenset(st.secrets.admin.admin_user_ids)
+
+
+def is_admin_user(user_id):
+    """Return True if the given user_id is an admin user, otherwise False."""
+    return user_id in get_admin_user_ids()
@@ -6,19 +6,13 @@ countdown timer component.
 ToDo:
 - Rewrite to replace vanilla javascript implemnentation with React
 """
-import logging
 import os
 import streamlit as st
 import streamlit.components.v1 as components
-from pathlib import Path
+from utils.logging_utils import get_logger
 
 # setup logger
-logger = logging.getLogger(__name__)
-this_file_stem = Path(__file__).stem
-if this_file_stem in st.secrets.set_log_level:
-    logger.setLevel(st.secrets.set_log_level[this_file_stem])
-else:
-    logger.setLevel(logging.WARNING)
+logger = get_logger(__name__, __file__)
 
 # determine component's directory path
 component_dir = os.path.dirname(__file__)
@@ -0,0 +1,70 @@
+"""
+Module: utils/word_data.py
+Description: Contains utilities to load the words dataframe shared by the app pages.
+"""
+import os
+import streamlit as st
+from utils.config import lang_pair_to_all_words
+from data_tools.data_utils.data_schema import load_report_data_df_from_feather
+from utils.logging_utils import get_logger
+
+# setup logger
+logger = get_logger(__name__, __file__)
+
+
+@st.cache_resource(show_spinner="Reading app data...")  # cache read of language df as this is expensive
+def load_words_df(words_file, words_file_mtime):
+    """Return words dataframe loaded from given words feather file.
+
+    The cached dataframe is keyed on the words file and its modification time,
+    so the file is read (and its schema validated) once per version of the file.
+
+    The one cached dataframe is shared by all sessions (it is not copied), so it
+    must be treated as read-only.
+
+    Inputs:
+    words_file: str, path to translation report feather file
+    words_file_mtime: float, modification time of the words file, used only as part of the cache key
+
+    Return:
+    df: pd.DataFrame, translation report dataframe
+    """
+    logger.debug(f"call: load_words_df({words_file=}, {words_file_mtime=})")
+    df = load_report_data_df_from_feather(words_file)
+
+    logger.debug(f"return: df, total of {len(df)} items loaded")
+    return df
+
+
+def get_words_file_version():
+    """Return the words file for this session's source and target languages, and its modification time.
+
+    Return:
+    (words_file, words_file_mtime): tuple of str and float, the words file version
+    """
+    logger.debug(f"call: get_words_file_version()")
+    words_file = lang_pair_to_all_words[(st.session_state.source_language, st.session_state.target_language)]
+    return words_file, os.path.getmtime(words_file)
+
+
+def get_df_words():
+    """Return words dataframe for this session's source and target languages.
+
+    The words dataframe is the output from the data_tools process pipleline.
+    It contains all the source and target language word pairs after the data has been cleansed
+    and the translation has been checked.
+
+    The dataframe is a cached resource shared by all sessions, it is not held in the
+    session state. It is reloaded when the words file is modified. Treat it as read-only.
+
+    Return:
+    df: pd.DataFrame, translation report dataframe for this session's source and target language word pairs
+    """
+    logger.debug(f"call: get_df_words()")
+
+    # load all words translation report feather file into a dataframe
+    # the load is cached until the file is modified
+    df = load_words_df(*get_words_file_version())
+
+    logger.debug(f"return: df, total of {len(df)} items loaded")
+    return df